@@ -9,24 +9,105 @@ EXAMPLE:
 """
 
 
-from glob import glob as _glob
-import os as _os
-
-# Prepare modules for search function and for import
-_folder_path_for_glob = _os.path.join(_os.path.dirname(__file__), "*")
-_all_file_names = [_os.path.basename(path) for path in _glob(_folder_path_for_glob)]
-_all_modules_str = []
-for _name in _all_file_names:
-    if (_name[-3:] == ".py") and (_name[0] != "_"):
-        _all_modules_str.append(_name[:-3])
-
-
-# Import all the modules correctly and exposes everything callable to the search function.
-_all_searchable = []
-for _module in _all_modules_str:
-    exec(f"from . import {_module}")
-    exec(f"_module_all = {_module}.__all__") # Every module in `.` has everything which should be visible in `__all__`
-    exec("_all_searchable += [f'{_module}.{s}' for s in _module_all]")
+import importlib as _importlib
+
+# If False, every module is imported right away (the old behaviour). Mostly useful for debugging import errors.
+_LAZY_IMPORT = True
+
+# Static index of every public module and its `__all__`. This allows `search()` to work and `import dutils` to be fast,
+# without importing any of the (heavy) modules such as `pytorch`, `images` or `experimental`.
+# NOTE: This must be kept in sync with the `__all__` of each module (see `Test_init` in `_unit_tests/test_all.py`)
+_module_index = {
+    "all_around": [
+        "scientific_notation", "pandas_standardize_df", "get_grid_coordinates", "sturges_rule", "int_sign",
+        "ndarray_to_bins", "confusion_matrix_binary",
+    ],
+    "colors": [
+        "is_legal_hex", "is_legal_rgb", "get_color_type", "assert_color", "convert_color", "random_color",
+        "get_color", "display_colors", "get_color_scheme", "get_colors", "is_legal_rgb_01",
+    ],
+    "country_converter": [
+        "country_to_alpha2", "country_to_alpha3", "alpha2_to_country", "alpha2_to_alpha3", "alpha3_to_alpha2",
+        "alpha3_to_country",
+    ],
+    "experimental": [
+        "show_dicom", "load_dicom", "show_dicom_ndarray", "load_unspecified", "bucket_continuous_feature",
+        "stratified_folds", "DataLoaderDevice", "get_module_version", "normal_dist", "get_test_image",
+        "turn_off_numpy_scientific", "read_yolo_annotation_file", "xywhn2xyxy", "grep", "get_folder_memory_use",
+        "clear_cuda", "get_password", "date_range", "get_wordle_options", "ipynb_2_py", "inverse_normalize",
+        "download_youtube_video", "get_accessible", "read_pdf", "sorted_lexicographically", "show_frames_as_videos",
+        "has_windows_line_end", "save_numpy_frames_as_video", "get_file_dateformat", "thousands_split",
+        "lat_long_coord_2_address_info", "merge_pdfs", "TextSearcher", "assert_valid_image", "draw_text",
+    ],
+    "images": [
+        "assert_ndarray_image", "pillow_resize_image", "pillow_image_to_ndarray", "image_size_from_path",
+        "image_sizes_from_paths", "get_image_from_url", "get_images_from_urls", "ndarray_image_to_pillow",
+        "ndarray_resize_image", "show_image_from_path", "show_ndarray_image", "ndarray_image_center",
+        "cv2_cutout_square", "cv2_sobel_edge_detection", "cv2_draw_bounding_boxes", "draw_bounding_boxes",
+        "xywhn_to_xyxy", "xyxy_to_xywhn", "xywh_to_xyxy", "xyxy_to_xywh", "read_yolo_labels", "load_image",
+        "load_images", "rotate_image", "Cv2Webcam", "ImageCache", "enable_image_cache", "disable_image_cache",
+        "ndarray_bgr2rgb", "ndarray_rgb2bgr", "show_hist", "histogram_stretching", "gamma_correction", "apply_lut",
+        "ndarray_resize_image_batch", "rotate_image_batch", "gamma_correction_batch", "histogram_stretching_batch",
+        "ndarray_bgr2rgb_batch", "ndarray_rgb2bgr_batch",
+    ],
+    "imports": [
+        "get_imports", "get_available_functions", "get_all_available_import_classes", "get_module_path",
+        "compare_import_profiles", "profile_import",
+    ],
+    "input_output": [
+        "assert_path", "assert_path_dont_exists", "path_exists", "get_system_paths", "add_path_to_system",
+        "get_file_extension", "get_current_directory", "save_plt_plot", "get_file_basename", "write_to_file",
+        "read_json", "get_number_of_files", "read_file", "save_as_pickle", "load_pickle_file", "copy_folder",
+        "is_folder", "make_file", "is_file", "remove_file", "get_line_count_file", "get_line_counts_folder",
+        "get_file_size", "image_formats", "video_formats", "search_folder", "audio_formats", "compression_formats",
+        "search_file",
+    ],
+    "jupyter_ipython": [
+        "in_jupyter", "assert_in_jupyter", "adjust_screen_width", "play_audio", "show_image", "clear_variables",
+    ],
+    "pytorch": [
+        "ArcFaceClassifier", "arcface_loss", "RMSELoss", "templates", "seed_torch", "show_tensor_image", "get_device",
+        "get_parameter_count", "metric_acc", "get_batch", "get_model_save_name", "yolo_bb_from_normal_bb",
+        "yolo_draw_bbs_path", "yolo_draw_single_bb_cv2", "fold_performance_plot",
+    ],
+    "system_info": [
+        "windows_illegal_file_name_character", "get_vram_info", "get_gpu_info", "get_screen_dim", "get_os",
+        "on_windows", "get_computer_info",
+    ],
+    "time_and_date": [
+        "StopWatch", "FPSTimer", "month_names", "month_names_abb",
+    ],
+    "type_check": [
+        "assert_type", "assert_types", "assert_list_slow", "assert_in", "assert_comparison_number", "NoneType",
+        "ModuleType", "FunctionType",
+    ],
+    "videos": [
+        "get_video_info", "get_videos_info", "preprocess_video", "preprocess_videos", "video_to_images",
+        "images_to_video", "get_frame_from_video", "get_frames_from_video", "run_frame_pipeline",
+        "FrameStore",
+    ],
+}
+_all_modules_str = list(_module_index.keys())
+_all_searchable = [f"{module}.{name}" for module, names in _module_index.items() for name in names]
+
+
+def __getattr__(name:str):
+    """ Import the module `name` the first time it's accessed e.g. `dutils.images` """
+    if name not in _module_index:
+        raise AttributeError(f"module `{__name__}` has no attribute `{name}`")
+
+    module = _importlib.import_module(f".{name}", __name__)
+    globals()[name] = module # Cache it, so `__getattr__` is only called once per module
+    return module
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(_all_modules_str))
+
+
+if not _LAZY_IMPORT:
+    for _module in _all_modules_str:
+        __getattr__(_module)
 
 
 def search(name:str):
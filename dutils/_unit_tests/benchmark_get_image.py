@@ -0,0 +1,103 @@
+"""
+Microbenchmark of `jupyter_ipython._get_image()` for every kind of `source`, on a 1920x1080 image.
+ndarrays and tensors are compared against the Pillow route they used to take (`pillow_route()`), and the results
+are checked to be identical. Pillow images, paths and urls take the same route as before, so they are only timed.
+Run from this folder with `python benchmark_get_image.py`
+"""
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+from dutils.jupyter_ipython import _get_image
+
+
+def pillow_route(source, resize_factor:float=1.0, BGR2RGB:bool=None):
+    """ The original ndarray/tensor branch of `_get_image()`: remap to uint8, round trip through Pillow, strip alpha """
+    is_ndarray = isinstance(source, np.ndarray)
+    if "uint8" not in str(source.dtype):
+        to_uint8 = (lambda s: s.astype(np.uint8)) if is_ndarray else (lambda s: s.to(torch.uint8))
+        if (0.0 <= source).all() and (source <= 1.0).all():
+            source = to_uint8(source * 255)
+        elif (source > 1.0).any() and (0.0 <= source).all() and (source <= 255.0).all():
+            source = to_uint8(source)
+        else:
+            raise ValueError("Out of range")
+    if not is_ndarray:
+        source = source.detach().cpu()
+        source = source.permute(1, 2, 0) if (len(source.shape) > 2) else source
+        source = source.numpy()
+    image = Image.fromarray(source)
+
+    num_channels = len(image.getbands())
+    if BGR2RGB or ((BGR2RGB is None) and is_ndarray and (num_channels in [3, 4])):
+        code = cv2.COLOR_BGR2RGB if (num_channels == 3) else cv2.COLOR_BGRA2RGBA
+        image = Image.fromarray(cv2.cvtColor(np.asarray(image), code))
+    if resize_factor != 1.0:
+        image = image.resize((int(image.size[0] * resize_factor), int(image.size[1] * resize_factor)), resample=0)
+
+    image = np.asarray(image)
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    return image[:, :, :3] if (image.shape[-1] == 4) else image
+
+
+def ms_per_call(func, repeats:int=20) -> float:
+    """ Return the fastest of `repeats` calls in milliseconds """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+if __name__ == "__main__":
+    bgr = cv2.resize(cv2.imread("./dragon.jpg"), (1920, 1080))
+    tensor = torch.from_numpy(bgr).permute(2, 0, 1).contiguous()
+
+    # (name, source, kwargs)
+    cases = [
+        ("ndarray uint8 BGR", bgr, {}),
+        ("ndarray uint8 BGR2RGB=False", bgr, {"BGR2RGB": False}),
+        ("ndarray float32 0-1", bgr.astype(np.float32) / 255, {}),
+        ("ndarray uint8 resize 0.5", bgr, {"resize_factor": 0.5}),
+        ("tensor uint8", tensor, {}),
+        ("tensor float32 0-1", tensor.float() / 255, {}),
+    ]
+    print(f"{'source':<30} {'pillow route':>13} {'_get_image':>11}   (ms per call)")
+    for name, source, kwargs in cases:
+        assert (_get_image(source, **kwargs) == pillow_route(source, **kwargs)).all(), name
+        before = ms_per_call(lambda: pillow_route(source, **kwargs))
+        after = ms_per_call(lambda: _get_image(source, **kwargs))
+        print(f"{name:<30} {before:>13.2f} {after:>11.2f}")
+
+    # Unchanged routes, served from a temporary folder (urls through a local http server)
+    folder = tempfile.mkdtemp()
+    cv2.imwrite(os.path.join(folder, "image.jpg"), bgr)
+    cv2.imwrite(os.path.join(folder, "image.png"), bgr)
+
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=folder, **kwargs)
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/image.jpg"
+    try:
+        pillow_image = Image.fromarray(bgr[:, :, ::-1])
+        for name, source in [("PIL image", pillow_image), ("path jpg", os.path.join(folder, "image.jpg")),
+                             ("path png", os.path.join(folder, "image.png")), ("url jpg (local server)", url)]:
+            print(f"{name:<30} {'-':>13} {ms_per_call(lambda: _get_image(source), repeats=5):>11.2f}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(folder, ignore_errors=True)
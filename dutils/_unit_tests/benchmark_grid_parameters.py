@@ -0,0 +1,47 @@
+"""
+Microbenchmark of `jupyter_ipython._get_grid_parameters()` against the triple loop it replaced.
+Run from this folder with `python benchmark_grid_parameters.py`. The loop is skipped for large N, where it takes minutes.
+"""
+import time
+
+import numpy as np
+
+from dutils.jupyter_ipython import _get_grid_parameters
+
+
+def loop_grid_parameters(images, max_height=1080, max_width=1920, desired_ratio=9/17):
+    """ The original implementation of `_get_grid_parameters()`, kept as the reference """
+    N = len(images)
+    h, w, _ = images[0].shape
+    H, W = max_height, max_width
+
+    losses = {}
+    for a in [0.05 + 0.01 * i for i in range(96)]:
+        for x in range(1, N + 1):
+            for y in range(1, N + 1):
+                if (h * a * y > H) or (w * a * x > W) or (x * y < N):
+                    continue
+                losses[(y, x, a)] = abs((h * y) / (w * x) - desired_ratio) + (1 - a) ** 2 + x*y/N - 1
+    return min(losses, key=losses.get)
+
+
+def best_time(func, *args, repeats:int=3) -> float:
+    """ Return the fastest of `repeats` calls in seconds """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    print(f"{'N':>6} {'loop':>10} {'vectorized':>12}")
+    for N in [50, 200, 400, 1000, 5000, 20000]:
+        images = [np.zeros((24, 32, 3), dtype=np.uint8)] * N # Small images, so every N has a valid grid
+        if N <= 400:
+            assert tuple(_get_grid_parameters(images)[:3]) == loop_grid_parameters(images)
+            loop = f"{best_time(loop_grid_parameters, images, repeats=1):.2f}s"
+        else:
+            loop = "-"
+        print(f"{N:>6} {loop:>10} {best_time(_get_grid_parameters, images) * 1000:>10.1f}ms")
@@ -3,6 +3,7 @@ import numpy as np
 import os as os
 from glob import glob as glob
 import types as types
+import time as time
 import cv2 as cv2
 import unittest
 import matplotlib.pyplot as plt
@@ -58,6 +59,19 @@ else:
     print(colored("No missing values in any __all__\n\n", "green"))
 
 
+class Test_init(unittest.TestCase):
+    def test_module_index_in_sync(self):
+        # `dutils.search` and the lazy imports rely on the static index in `dutils/__init__.py`
+        import importlib
+        module_names = sorted(name[:-3] for name in os.listdir("../") if name.endswith(".py") and name[0] != "_")
+        self.assertEqual(sorted(U._module_index.keys()), module_names)
+
+        for module_str in module_names:
+            module = importlib.import_module(f"dutils.{module_str}")
+            self.assertEqual(sorted(U._module_index[module_str]), sorted(module.__all__),
+                             f"`dutils._module_index['{module_str}']` is out of sync with `{module_str}.__all__`")
+
+
 
 ########################################################################################################################
 ##########################################             all_around                #######################################
@@ -320,6 +334,86 @@ class Test_images(unittest.TestCase):
         self.assertEqual(len(load_image("./test_alpha.png", "grey").shape), 2)
         self.assertEqual(load_image("./test_alpha.png", "unchanged").shape[2], 4)
 
+        # Reduced decoding
+        with self.assertRaises(ValueError): load_image("./dragon.jpg", "unchanged", reduce=2)
+        with self.assertRaises(ValueError): load_image("./dragon.jpg", "rgb", reduce=3)
+        self.assertEqual(load_image("./dragon.jpg", "grey", reduce=2).shape, (233, 303))
+        with self.assertWarns(UserWarning): load_image("./test_grey.png", "bgr")
+
+
+    def test_load_images_batch(self):
+        paths = ["./test_image.png", "./test_alpha.png", "./dragon.jpg"]
+        with self.assertRaises(TypeError): load_images(paths, workers=1.0)
+        with self.assertRaises(ValueError): load_images(paths, "bgr", stack=True)
+
+        images = load_images(paths, "bgr", workers=2)
+        self.assertEqual([image.shape for image in images], [(290, 322, 3), (290, 322, 3), (465, 606, 3)])
+        self.assertEqual((images[2] == cv2.imread("./dragon.jpg")).all(), True)
+
+        batch = load_images(paths[:2] * 3, "rgb", stack=True)
+        self.assertEqual(batch.shape, (6, 290, 322, 3))
+        self.assertEqual((batch[4] == load_image("./test_image.png", "rgb")).all(), True)
+
+
+    def test_image_cache(self):
+        with self.assertRaises(ValueError): ImageCache(0)
+        cache = enable_image_cache(max_megabytes=1.2)
+        try:
+            first = load_image("./dragon.jpg", "rgb")
+            second = load_image("./dragon.jpg", "rgb")
+            self.assertIs(first, second)
+            self.assertEqual(first.flags.writeable, False)
+            self.assertEqual(load_image("./dragon.jpg", "grey").ndim, 2) # Different `load_type` -> different entry
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+
+            # A third image exceeds the budget of 1.2MB, so the least recently used one (the grey dragon) is evicted
+            load_images(["./dragon.jpg", "./test_image.png"], "rgb", workers=1)
+            stats = cache.stats()
+            self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 3, 1))
+            self.assertLessEqual(stats["megabytes"], 1.2)
+        finally:
+            disable_image_cache()
+        self.assertEqual(load_image("./dragon.jpg", "rgb").flags.writeable, True)
+
+
+    def test_image_size_from_path(self):
+        with self.assertRaises(TypeError): image_size_from_path("./dragon.jpg", WxH=1)
+        self.assertEqual(image_size_from_path("./dragon.jpg"), (606, 465))
+        self.assertEqual(image_size_from_path("./dragon.jpg", WxH=False), (465, 606))
+
+        # Every supported header should agree with a full decode
+        image = cv2.imread("./dragon.jpg")[:, :-1]
+        paths = [f"./test_size.{extension}" for extension in ["png", "jpg", "bmp", "tiff", "webp"]]
+        [cv2.imwrite(path, image) for path in paths]
+        ndarray_image_to_pillow(image).save("./test_size.gif")
+        paths.append("./test_size.gif")
+
+        self.assertEqual(image_sizes_from_paths(paths, workers=2), [(605, 465)] * len(paths))
+        [os.remove(path) for path in paths]
+
+        # A JPEG cut off in the middle of its Start Of Frame segment has no usable header
+        from dutils.images import _image_size_from_header
+        with open("./dragon.jpg", "rb") as f:
+            data = f.read()
+        sof = data.index(b"\xff\xc0")
+        for end in [sof + 3, sof + 6]:
+            with open("./test_truncated.jpg", "wb") as f:
+                f.write(data[:end])
+            self.assertIsNone(_image_size_from_header("./test_truncated.jpg"))
+        os.remove("./test_truncated.jpg")
+
+        # Camera JPEGs can have well over 2KB of APPn data in front of the Start Of Frame segment
+        from dutils.images import _is_greyscale_file
+        app2 = b"\xff\xe2" + (2 + 10_000).to_bytes(2, "big") + bytes(10_000)
+        grey = cv2.imencode(".jpg", cv2.imread("./dragon.jpg", cv2.IMREAD_GRAYSCALE))[1].tobytes()
+        self.assertEqual(_is_greyscale_file(data[:2] + app2 + data[2:]), False)
+        self.assertEqual(_is_greyscale_file(grey[:2] + app2 + grey[2:]), True)
+        self.assertIsNone(_is_greyscale_file(data[:sof + 6]))
+        with open("./test_large_header.jpg", "wb") as f:
+            f.write(data[:2] + app2 + data[2:])
+        self.assertEqual(_image_size_from_header("./test_large_header.jpg"), (606, 465))
+        os.remove("./test_large_header.jpg")
+
 
     def test_rotate_images(self):
         img = cv2.imread("./dragon.jpg")
@@ -328,6 +422,114 @@ class Test_images(unittest.TestCase):
         self.assertEqual(rotate_image(img, 270).shape, (606, 465, 3))
 
 
+    def test_batch_transforms(self):
+        batch = np.stack([cv2.imread("./dragon.jpg"), cv2.imread("./dragon.jpg") // 2 + 50])
+        with self.assertRaises(TypeError): gamma_correction_batch(batch.astype(np.float32), 1.5)
+        with self.assertRaises(ValueError): gamma_correction_batch(batch[0, 0], 1.5)
+        with self.assertRaises(ValueError): ndarray_bgr2rgb_batch(batch[..., 0])
+        with self.assertRaises(ValueError): rotate_image_batch(batch, 45)
+        with self.assertRaises(ValueError): ndarray_resize_image_batch(batch, 0.5, out=np.empty_like(batch))
+
+        # Every batch transform must agree with its single image counterpart
+        for i, image in enumerate(batch):
+            self.assertEqual((ndarray_resize_image_batch(batch, 0.5)[i] == ndarray_resize_image(image, 0.5)).all(), True)
+            self.assertEqual((rotate_image_batch(batch, -90)[i] == rotate_image(image, -90)).all(), True)
+            self.assertEqual((gamma_correction_batch(batch, 0.5)[i] == gamma_correction(image, 0.5)).all(), True)
+            self.assertEqual((ndarray_bgr2rgb_batch(batch)[i] == ndarray_bgr2rgb(image)).all(), True)
+            stretched = histogram_stretching(image, 10, 200).astype(np.uint8)
+            self.assertEqual((histogram_stretching_batch(batch, 10, 200)[i] == stretched).all(), True)
+
+        # `out` may be the input itself
+        expected = ndarray_rgb2bgr_batch(batch)
+        self.assertIs(ndarray_rgb2bgr_batch(batch, out=batch), batch)
+        self.assertEqual((batch == expected).all(), True)
+
+
+    def test_cv2_webcam_threaded_capture(self):
+        with self.assertRaises(ValueError): Cv2Webcam(drop_policy="random")
+        with self.assertRaises(ValueError): Cv2Webcam(buffer_size=0)
+
+        # A lossless video stands in for the webcam, frame `i` has the pixel value `i`
+        writer = cv2.VideoWriter("./test_webcam.avi", cv2.VideoWriter_fourcc(*"FFV1"), 10, (64, 48))
+        [writer.write(np.full((48, 64, 3), i, dtype=np.uint8)) for i in range(40)]
+        writer.release()
+
+        class Recorder(Cv2Webcam):
+            def __init__(self, delay, **kwargs):
+                super().__init__("./test_webcam.avi", show_fps=False, threaded=True, sink="null", **kwargs)
+                self.delay, self.values = delay, []
+            def on_update(self):
+                self.values.append(int(self.frame.mean()))
+                time.sleep(self.delay)
+                return self.frame
+
+        def capture(drop_policy, buffer_size, delay):
+            cam = Recorder(delay, buffer_size=buffer_size, drop_policy=drop_policy)
+            cam.start() # Returns once the video is exhausted, `stop()` is called on the way out
+            return cam.values, cam.get_stats()
+
+        # Nothing is dropped when capture has to wait for processing
+        values, stats = capture("block", 4, 0.005)
+        self.assertEqual(values, list(range(40)))
+        self.assertEqual((stats["captured_frames"], stats["processed_frames"], stats["dropped_frames"]), (40, 40, 0))
+
+        # A slow consumer only sees some of the frames, but always in order
+        for drop_policy in ["oldest", "newest"]:
+            values, stats = capture(drop_policy, 1, 0.02)
+            self.assertEqual(values, sorted(set(values)))
+            self.assertGreater(stats["dropped_frames"], 0)
+            self.assertEqual(stats["captured_frames"], stats["processed_frames"] + stats["dropped_frames"])
+
+        # Frame counts and fps are tracked without keeping a timestamp per frame around
+        cam = Recorder(0.0, buffer_size=2, drop_policy="block")
+        report = cam.benchmark()
+        stats = cam.get_stats()
+        self.assertEqual((report["frames"], stats["captured_frames"], stats["processed_frames"]), (40, 40, 40))
+        self.assertGreater(stats["processing_fps"], 0)
+        self.assertEqual((cam.fps_timer.get_frame_count(), cam.capture_fps_timer.get_frame_count()), (40, 40))
+        self.assertEqual(cam.fps_timer.get_fps(), stats["processing_fps"])
+
+        os.remove("./test_webcam.avi")
+
+
+    def test_cv2_webcam_sources_and_sinks(self):
+        with self.assertRaises(TypeError): Cv2Webcam(1.5)
+        with self.assertRaises(TypeError): Cv2Webcam(np.zeros((48, 64, 3), dtype=np.uint8))
+        with self.assertRaises(TypeError): Cv2Webcam(np.zeros((5, 48, 64, 3), dtype=np.uint8))
+        with self.assertRaises(ValueError): Cv2Webcam(sink="./frames.txt")
+
+        class Invert(Cv2Webcam):
+            def on_update(self):
+                return 255 - self.frame
+
+        # Generator -> callable
+        received = []
+        Invert((np.full((48, 64, 3), i, dtype=np.uint8) for i in range(10)), False, sink=received.append).start()
+        self.assertEqual([int(frame.mean()) for frame in received], [255 - i for i in range(10)])
+
+        # A stack of frames has to be passed as a list of frames
+        received = []
+        stack = np.stack([np.full((48, 64, 3), i, dtype=np.uint8) for i in range(4)])
+        Invert(list(stack), False, sink=received.append).start()
+        self.assertEqual([frame.shape for frame in received], [(48, 64, 3)] * 4)
+
+        # Image folder -> video file
+        os.mkdir("./test_webcam_frames")
+        [cv2.imwrite(f"./test_webcam_frames/{i:02d}.png", np.full((48, 64, 3), i, dtype=np.uint8)) for i in range(5)]
+        Invert("./test_webcam_frames", threaded=True, drop_policy="block", sink="./test_webcam_out.avi").start()
+        self.assertEqual(int(cv2.VideoCapture("./test_webcam_out.avi").get(cv2.CAP_PROP_FRAME_COUNT)), 5)
+
+        # Headless benchmark
+        report = Invert("./test_webcam_frames").benchmark(max_frames=3, percentiles=(50, 99))
+        self.assertEqual(report["frames"], 3)
+        self.assertEqual(list(report["on_update"].keys()), ["mean", "p50", "p99", "max"])
+        self.assertEqual(set(report.keys()), {"frames", "fps", "read", "on_update", "sink"})
+
+        [os.remove(path) for path in glob("./test_webcam_frames/*")]
+        os.rmdir("./test_webcam_frames")
+        os.remove("./test_webcam_out.avi")
+
+
     def test_assert_ndarray_image(self):
         grey = load_image("./test_grey.png")
         color = load_image("./test_image.png")
@@ -367,6 +569,27 @@ class Test_images(unittest.TestCase):
 
 
     def test_histogram_stretching(self):
+        image = cv2.imread("./dragon.jpg") // 2 + 50 # Pixel values in [61, 177]
+        with self.assertRaises(ValueError): histogram_stretching(image, 200, 100)
+        with self.assertRaises(ValueError): histogram_stretching(image, percentiles=(99, 1))
+
+        stretched = histogram_stretching(image, 10, 200)
+        self.assertEqual(stretched.dtype, np.uint8)
+        self.assertEqual((stretched.min(), stretched.max()), (10, 200))
+        self.assertEqual((stretched == np.rint((190 / 116) * (image - 61) + 10)).all(), True)
+
+        # Every channel reaches the full range when stretched on its own
+        image[..., 0] //= 2
+        stretched = histogram_stretching(image, per_channel=True, out=image)
+        self.assertIs(stretched, image)
+        self.assertEqual([(image[..., c].min(), image[..., c].max()) for c in range(3)], [(0, 255)] * 3)
+
+        # The 5% darkest and brightest pixels are saturated
+        grey = load_image("./dragon.jpg", "grey") // 2 + 50
+        stretched = histogram_stretching(grey, percentiles=(5, 95))
+        self.assertAlmostEqual((stretched == 0).mean(), 0.05, delta=0.02)
+        self.assertAlmostEqual((stretched == 255).mean(), 0.05, delta=0.02)
+
         if VERBOSE:
             img = load_image("./dragon.jpg", "grey")
             img_new = histogram_stretching(img).astype(np.uint8)
@@ -381,13 +604,191 @@ class Test_images(unittest.TestCase):
             if AUTO_PRESS: keyboard.press("q")
 
 
+    def test_apply_lut(self):
+        image = cv2.imread("./dragon.jpg")
+        invert = 255 - np.arange(256, dtype=np.uint8)
+        with self.assertRaises(ValueError): apply_lut(image, invert[:255])
+        with self.assertRaises(ValueError): apply_lut(image, invert.astype(np.int32))
+        with self.assertRaises(ValueError): apply_lut(image[..., 0], np.stack([invert] * 3, axis=1))
+        with self.assertRaises(TypeError): apply_lut(image.astype(np.float32), invert)
+
+        self.assertEqual((apply_lut(image, invert) == 255 - image).all(), True)
+        self.assertEqual((apply_lut(image[::2], invert) == 255 - image[::2]).all(), True) # Non contiguous
+
+        # One table per channel, here: invert only the red channel
+        tables = np.stack([np.arange(256, dtype=np.uint8)] * 2 + [invert], axis=1)
+        expected = image.copy()
+        expected[..., 2] = 255 - expected[..., 2]
+        self.assertEqual((apply_lut(image, tables) == expected).all(), True)
+
+        # In-place
+        self.assertIs(apply_lut(image, invert, out=image), image)
+        self.assertEqual((image == 255 - cv2.imread("./dragon.jpg")).all(), True)
+
+
     def test_gamma_correction(self):
+        image = load_image("./dragon.jpg")
+        expected = ((image / 255.0) ** 2.0 * 255).astype(np.uint8)
+        self.assertEqual((gamma_correction(image, 2.0) == expected).all(), True)
+        self.assertIs(gamma_correction(image, 2.0, out=image), image)
+        self.assertEqual((image == expected).all(), True)
+
         if VERBOSE:
             img = load_image("./dragon.jpg", "grey")
             show_ndarray_image(gamma_correction(img, 3.0))
             if AUTO_PRESS: keyboard.press("q")
 
 
+    def test_draw_bounding_boxes(self):
+        image = np.zeros((100, 200, 3), dtype=np.uint8)
+        boxes = np.array([[10, 20, 60, 80], [100, 10, 190, 90]])
+
+        # Checks
+        with self.assertRaises(ValueError): draw_bounding_boxes(image, boxes[:, :3])
+        with self.assertRaises(ValueError): draw_bounding_boxes(image, boxes, labels=["Cat"])
+        with self.assertRaises(ValueError): draw_bounding_boxes(image, boxes, box_format="cxcywh")
+        with self.assertRaises(ValueError): draw_bounding_boxes(image, boxes, colors=[(255, 0, 0)] * 3)
+
+        # Not inplace + the box outline
+        drawn = draw_bounding_boxes(image, boxes, colors=(0, 0, 255), inplace=False)
+        self.assertEqual(image.any(), False)
+        self.assertEqual(tuple(drawn[20, 35]), (0, 0, 255))
+        self.assertEqual(tuple(drawn[50, 35]), (0, 0, 0))
+
+        # Same boxes expressed as xywh and YOLO normalized
+        xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+        xywhn = np.concatenate([(boxes[:, :2] + boxes[:, 2:]) / 2, xywh[:, 2:]], axis=1) / [200, 100, 200, 100]
+        for values, box_format in [(xywh, "xywh"), (xywhn, "xywhn")]:
+            other = draw_bounding_boxes(image, values, colors=(0, 0, 255), box_format=box_format, inplace=False)
+            self.assertEqual((other == drawn).all(), True)
+
+        # Inplace with labels and confidence scores, a label at the top of the image is moved inside the box
+        result = draw_bounding_boxes(image, boxes, labels=["Cat", 3], confs=[0.7, 0.35])
+        self.assertIs(result, image)
+        self.assertEqual(image.any(), True)
+        self.assertEqual(image[:8, 100:].any(), False) # No room above the 2nd box, so its label is drawn inside
+        self.assertEqual(image[12:18, 102:120].any(), True)
+
+        if VERBOSE:
+            show_ndarray_image(image)
+            if AUTO_PRESS: keyboard.press("q")
+
+
+    def test_box_conversions(self):
+        with self.assertRaises(ValueError): xywh_to_xyxy(np.zeros((3, 5)))
+        with self.assertRaises(ValueError): xyxy_to_xywh(np.array([["a", "b", "c", "d"]]))
+        with self.assertRaises(TypeError): xywhn_to_xyxy([[0.5, 0.5, 0.2, 0.4]], 200, 100)
+
+        xywhn = np.array([[0.5, 0.5, 0.2, 0.4], [0.05, 0.1, 0.3, 0.2]])
+        xyxy = xywhn_to_xyxy(xywhn, 200, 100)
+        self.assertEqual(np.allclose(xyxy, [[80, 30, 120, 70], [-20, 0, 40, 20]]), True)
+        self.assertEqual(np.allclose(xywhn_to_xyxy(xywhn, 200, 100, clip=True)[1], [0, 0, 40, 20]), True)
+        self.assertEqual(np.allclose(xyxy_to_xywhn(xyxy, 200, 100), xywhn), True)
+        self.assertEqual(xywhn_to_xyxy(xywhn.astype(np.float32), 200, 100).dtype, np.float32)
+
+        # Same results as the old one box at a time conversion
+        self.assertEqual((xyxy_to_xywh(np.array([[80, 30, 120, 70]])) == [[80, 30, 40, 40]]).all(), True)
+        self.assertEqual((xywh_to_xyxy(np.array([[80, 30, 40, 40]])) == [[80, 30, 120, 70]]).all(), True)
+
+
+    def test_read_yolo_labels(self):
+        folder = "./test_yolo_labels"
+        os.mkdir(folder)
+        try:
+            for name, content in [("a.txt", "0 0.5 0.5 0.2 0.4\n3 0.1 0.2 0.3 0.4\n"), ("b.txt", ""),
+                                  ("c.txt", "7 0.25 0.25 0.5 0.5")]:
+                with open(os.path.join(folder, name), "w") as f:
+                    f.write(content)
+
+            for chunk_size in [1, 2, 1024]:
+                records, offsets, paths = read_yolo_labels(folder, workers=2, chunk_size=chunk_size)
+                self.assertEqual([os.path.basename(p) for p in paths], ["a.txt", "b.txt", "c.txt"])
+                self.assertEqual(offsets.tolist(), [0, 2, 2, 3])
+                self.assertEqual(records["image_id"].tolist(), [0, 0, 2])
+                self.assertEqual(records["class"].tolist(), [0, 3, 7])
+                self.assertEqual(np.allclose(records[offsets[2]:offsets[3]]["box"], [[0.25, 0.25, 0.5, 0.5]]), True)
+                self.assertEqual(records.itemsize, 22)
+
+            with open(os.path.join(folder, "d.txt"), "w") as f:
+                f.write("1 0.5 0.5 0.2\n")
+            with self.assertRaisesRegex(ValueError, "d.txt` line 1 "): read_yolo_labels(folder)
+            # 4 + 6 values add up to a multiple of 5, but every line must have exactly 5 on its own
+            with open(os.path.join(folder, "d.txt"), "w") as f:
+                f.write("0 0.5 0.5 0.2 0.2\n\n1 0.5 0.5 0.2\n2 0.5 0.5 0.2 0.2 3\n")
+            with self.assertRaisesRegex(ValueError, "d.txt` line 3 "): read_yolo_labels(folder)
+            with open(os.path.join(folder, "d.txt"), "w") as f:
+                f.write("0 0.5 0.5 0.2 0.2\n1 0.5 0.5 0.2 abc\n")
+            with self.assertRaisesRegex(ValueError, "d.txt` line 2 "): read_yolo_labels(folder)
+            with open(os.path.join(folder, "d.txt"), "w") as f:
+                f.write("1.5 0.5 0.5 0.2 0.2\n")
+            with self.assertRaises(ValueError): read_yolo_labels(folder)
+        finally:
+            for path in glob(os.path.join(folder, "*")):
+                os.remove(path)
+            os.rmdir(folder)
+
+
+    def test_get_images_from_urls(self):
+        import http.server, threading, shutil, warnings
+        from PIL import Image
+
+        # Local stand-in for an image host
+        class QuietHandler(http.server.SimpleHTTPRequestHandler):
+            def log_message(self, *args): pass
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/"
+        names = ["dragon.jpg", "test_image.png", "test_grey.png", "test_alpha.png"]
+        cache_dir = "./test_url_cache"
+
+        try:
+            with self.assertRaises(ValueError): get_images_from_urls([base + "dragon.jpg"], return_type="numpy")
+            with self.assertRaises(TypeError): get_images_from_urls(base + "dragon.jpg")
+
+            # Same images (and order) as decoding the files directly
+            images = get_images_from_urls([base + name for name in names], workers=3)
+            for name, image in zip(names, images):
+                expected = Image.open(name)
+                expected = expected if expected.mode in ["RGB", "RGBA"] else expected.convert("RGB")
+                self.assertEqual((image == pillow_image_to_ndarray(expected)).all(), True)
+            self.assertEqual(get_images_from_urls([base + "dragon.jpg"], "pillow")[0].size, Image.open("dragon.jpg").size)
+            self.assertEqual((get_image_from_url(base + "dragon.jpg") == images[0]).all(), True)
+
+            # A larger pool is mounted on the same session and the old connection pool is closed, not leaked
+            from dutils.images import _get_url_session
+            session = _get_url_session()
+            old_adapter = session.get_adapter(base)
+            self.assertGreater(len(old_adapter.poolmanager.pools), 0)
+            self.assertIs(_get_url_session(256), session)
+            self.assertIsNot(session.get_adapter(base), old_adapter)
+            self.assertEqual(len(old_adapter.poolmanager.pools), 0)
+            self.assertEqual((get_images_from_urls([base + "dragon.jpg"])[0] == images[0]).all(), True)
+
+            # Errors
+            import requests
+            with self.assertRaises(requests.HTTPError): get_images_from_urls([base + "missing.jpg"])
+            with self.assertRaises(OSError): get_images_from_urls([base + "test_audio.wav"])
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                result = get_images_from_urls([base + "missing.jpg", base + "dragon.jpg"], skip_errors=True)
+            self.assertIsNone(result[0])
+            self.assertEqual(result[1].shape, images[0].shape)
+
+            # Content-addressed cache, the same image behind two urls is stored once and used once the server is gone
+            get_images_from_urls([base + "dragon.jpg", base + "./dragon.jpg", base + "test_image.png"], cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "objects"))), 2)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "urls"))), 3)
+            server.shutdown()
+            server.server_close()
+            cached = get_images_from_urls([base + "./dragon.jpg", base + "test_image.png"], cache_dir=cache_dir)
+            self.assertEqual((cached[0] == images[0]).all(), True)
+            self.assertEqual((cached[1] == images[1]).all(), True)
+        finally:
+            server.shutdown()
+            server.server_close()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
 ########################################################################################################################
 ##########################################             imports                ##########################################
 ########################################################################################################################
@@ -416,6 +817,18 @@ class Test_imports(unittest.TestCase):
         self.assertEqual(get_all_available_import_classes(imports), [])
 
 
+    def test_profile_import(self):
+        with self.assertRaises(ValueError): profile_import(["not_a_module"])
+        with self.assertRaises(ValueError): profile_import(["type_check"], save_path="./report.txt")
+
+        report = profile_import(["type_check"])
+        self.assertEqual(report["modules"]["type_check"]["error"], None)
+        self.assertEqual(compare_import_profiles(report, report), [])
+
+        slower = {"modules": {"type_check": dict(report["modules"]["type_check"], wall_time_sec=100.0)}}
+        self.assertEqual(len(compare_import_profiles(slower, report)), 1)
+
+
 ########################################################################################################################
 ##########################################             Input_output                #####################################
 ########################################################################################################################
@@ -631,6 +1044,127 @@ class Test_jupyter(unittest.TestCase):
             pass
 
 
+    def test_get_grid_parameters(self):
+        from dutils.jupyter_ipython import _get_grid_parameters
+
+        def naive(N, h, w, H=1080, W=1920, desired_ratio=9/17):
+            losses = {}
+            for a in [0.05 + 0.01 * i for i in range(96)]:
+                for x in range(1, N + 1):
+                    for y in range(1, N + 1):
+                        if not ((h * a * y > H) or (w * a * x > W) or (x * y < N)):
+                            losses[(y, x, a)] = abs((h * y) / (w * x) - desired_ratio) + (1 - a) ** 2 + x*y/N - 1
+            return min(losses, key=losses.get)
+
+        random_state = np.random.RandomState(12)
+        for N in list(range(1, 25)) + [40, 77]:
+            h, w = random_state.randint(5, 1200, 2).tolist()
+            images = [np.zeros((h, w, 3), dtype=np.uint8)] * N
+            cols, rows, scale, loss_info = _get_grid_parameters(images)
+            self.assertEqual((cols, rows, scale), naive(N, h, w))
+            self.assertAlmostEqual(loss_info["total"], loss_info["ratio"] + loss_info["scale"] + loss_info["empty_cell"])
+
+        with self.assertRaises(ValueError): _get_grid_parameters([np.zeros((1080, 1920, 3))] * 500)
+
+
+    def test_get_collage_image(self):
+        from dutils.jupyter_ipython import _get_collage_image, _pack_rectangles
+        from rectpack import newPacker
+
+        random_state = np.random.RandomState(12)
+        images = [np.full((h, w, 3), i + 100, dtype=np.uint8)
+                  for i, (h, w) in enumerate(random_state.randint(50, 400, (30, 2)).tolist())]
+
+        # Same layout as a single bin `newPacker`
+        rectangles = [(image.shape[0], image.shape[1], i) for i, image in enumerate(images)]
+        rectangles = sorted(rectangles, reverse=True, key=lambda r: r[0] * r[1])
+        packer = newPacker(rotation=False)
+        for r in rectangles: packer.add_rect(*r)
+        packer.add_bin(1200, 2000)
+        packer.pack()
+        packed = _pack_rectangles(rectangles, (1200, 2000), False)
+        self.assertEqual(sorted(packed.rect_list()), sorted(packer[0].rect_list()))
+        self.assertIsNone(_pack_rectangles(rectangles, (300, 500), False))
+
+        # Every image ends up in the collage exactly once
+        collage = _get_collage_image(images)
+        values, counts = np.unique(collage[..., 0], return_counts=True)
+        counts = dict(zip(values.tolist(), counts.tolist()))
+        for i, image in enumerate(images):
+            self.assertEqual(counts[i + 100], image.shape[0] * image.shape[1])
+
+
+    def test_get_image_ndarray_fast_path(self):
+        from dutils.jupyter_ipython import _get_image
+        from PIL import Image
+        import torch
+
+        bgr = cv2.imread("./dragon.jpg")
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+        # Same results as going through Pillow
+        self.assertEqual((_get_image(bgr) == rgb).all(), True)
+        self.assertEqual((_get_image(bgr.astype(np.float32) / 255) == (bgr.astype(np.float32) / 255 * 255).astype(np.uint8)[..., ::-1]).all(), True)
+        self.assertEqual((_get_image(torch.from_numpy(bgr.transpose(2, 0, 1).copy())) == bgr).all(), True)
+        expected = np.asarray(Image.fromarray(rgb).resize((int(bgr.shape[1] * 0.37), int(bgr.shape[0] * 0.37)), resample=0))
+        self.assertEqual((_get_image(bgr, 0.37) == expected).all(), True)
+        grey = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        self.assertEqual((_get_image(grey, image_border=0)[1:-1, 1:-1] == cv2.cvtColor(grey, cv2.COLOR_GRAY2RGB)).all(), True)
+
+        # Zero-copy when nothing has to change, but never writable and `source` is never modified
+        image = _get_image(rgb, BGR2RGB=False)
+        self.assertEqual(np.shares_memory(image, rgb), True)
+        self.assertEqual(image.flags.writeable, False)
+        _get_image(bgr, BGR2RGB=True)
+        self.assertEqual((bgr == cv2.imread("./dragon.jpg")).all(), True)
+
+        # Value range checks
+        with self.assertRaises(ValueError): _get_image(bgr.astype(np.float32) - 100)
+        with self.assertRaises(ValueError): _get_image(np.full((10, 10, 3), np.nan, dtype=np.float32))
+        with self.assertRaises(ValueError): _get_image(torch.full((3, 10, 10), 256.0))
+        with self.assertRaises(ValueError): _get_image(bgr.astype(bool))
+
+
+    def test_show_image_thumbnails(self):
+        import dutils.jupyter_ipython as jupyter_ipython
+        from dutils.jupyter_ipython import _get_image
+        from PIL import Image
+
+        folder = "./test_thumbnails"
+        os.mkdir(folder)
+        jupyter_ipython._ALLOW_NONE_JUPYTER = True
+        try:
+            big = cv2.resize(cv2.imread("./dragon.jpg"), (1600, 1200))
+            paths = []
+            for i in range(12):
+                paths.append(os.path.join(folder, f"{i}.jpg"))
+                cv2.imwrite(paths[-1], big)
+            cv2.imwrite(os.path.join(folder, "p.png"), big[:900])
+
+            # Every kind of source is shrunk to `max_size` along its longest side
+            for source in [paths[0], big, Image.open(paths[0])]:
+                self.assertEqual(_get_image(source, max_size=200).shape, (150, 200, 3))
+            self.assertEqual(_get_image(os.path.join(folder, "p.png"), max_size=200).shape, (112, 200, 3))
+            self.assertEqual(_get_image(paths[0], 0.1, max_size=200).shape, (120, 160, 3))
+            self.assertEqual(_get_image(big, max_size=2000).shape, big.shape)
+
+            # Decoding at reduced size looks like the full size image resized
+            full = cv2.resize(_get_image(paths[0]), (200, 150), interpolation=cv2.INTER_AREA).astype(int)
+            self.assertLess(np.abs(_get_image(paths[0], max_size=200) - full).mean(), 5)
+
+            with self.assertRaises(ValueError): show_image(paths, thumbnail_size="small")
+            with self.assertRaises(ValueError): show_image(paths, thumbnail_size=0)
+            small = show_image(paths, thumbnail_size=100, return_image=True)
+            auto = show_image(paths, thumbnail_size="auto", return_image=True, workers=2)
+            self.assertLessEqual(max(small.shape[:2]), 400)
+            self.assertGreater(auto.size, small.size)
+        finally:
+            jupyter_ipython._ALLOW_NONE_JUPYTER = False
+            for path in glob(os.path.join(folder, "*")):
+                os.remove(path)
+            os.rmdir(folder)
+
+
 ########################################################################################################################
 ##########################################             pytorch                ##########################################
 ########################################################################################################################
@@ -743,7 +1277,15 @@ class UnitTests(unittest.TestCase):
         self.assertEqual(fps_timer.get_frame_count(), 1)
         fps_timer.get_fps()
         fps_timer.increment()
+
+        # Every frame is counted, but only the last 2 ticks are kept around
+        for _ in range(1000):
+            fps_timer.increment()
+        self.assertEqual(fps_timer.get_frame_count(), 1002)
+        self.assertEqual(len(fps_timer.ticks), 2)
+        self.assertGreaterEqual(fps_timer.get_fps(), 0)
         fps_timer.reset()
+        self.assertEqual((fps_timer.get_frame_count(), fps_timer.get_fps()), (0, 0))
 
 
     def test_months(self):
@@ -838,6 +1380,204 @@ class Unit_type_check(unittest.TestCase):
         assert_comparison_number(0, 0, "=", "number_of_cats")
 
 
+########################################################################################################################
+#########################################             videos                ############################################
+########################################################################################################################
+
+
+from dutils.videos import *
+class Test_videos(unittest.TestCase):
+
+    @staticmethod
+    def make_test_video(path, frames=30, width=64, height=48):
+        """ Write a small (lossless) video where every frame `i` has the pixel value `i` """
+        video = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"FFV1"), 10, (width, height))
+        for i in range(frames):
+            video.write(np.full((height, width, 3), i, dtype=np.uint8))
+        video.release()
+
+
+    def test_preprocess_video(self):
+        self.make_test_video("./test_video_in.avi")
+        with self.assertRaises(ValueError): preprocess_video("./test_video_in.avi", "./test_video_out.avi", 0)
+        with self.assertRaises(ValueError): preprocess_video("./test_video_in.avi", "./test_video_out.mov")
+
+        preprocess_video("./test_video_in.avi", "./test_video_out.avi", 3, 0.5, 90, 10)
+        cap = cv2.VideoCapture("./test_video_out.avi")
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 10)
+        self.assertEqual((int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))), (24, 32))
+        cap.release()
+
+        # Segments processed in parallel must be stitched together into the exact same video
+        preprocess_video("./test_video_in.avi", "./test_video_out_parallel.avi", 3, 0.5, 90, 10, workers=2)
+        preprocess_videos(["./test_video_in.avi"], ["./test_video_out_batch.avi"], 2, 3, 0.5, 90, 10)
+        with open("./test_video_out.avi", "rb") as f: expected = f.read()
+        for path in ["./test_video_out_parallel.avi", "./test_video_out_batch.avi"]:
+            with open(path, "rb") as f: self.assertEqual(f.read(), expected)
+            os.remove(path)
+
+        os.remove("./test_video_in.avi")
+        os.remove("./test_video_out.avi")
+
+
+    def test_video_to_images(self):
+        self.make_test_video("./test_video_in.avi")
+        os.mkdir("./test_frames")
+        with self.assertRaises(ValueError): video_to_images("./test_video_in.avi", "./test_frames", ".gif")
+        with self.assertRaises(ValueError): video_to_images("./test_video_in.avi", "./test_frames", png_compression=10)
+        with self.assertRaises(ValueError): video_to_images("./test_video_in.avi", "./test_frames", start_sec=2, end_sec=1)
+        # `end_sec` is checked on its own as well. The test video is 3 seconds long
+        with self.assertRaises(ValueError): video_to_images("./test_video_in.avi", "./test_frames", end_sec=0)
+        with self.assertRaises(ValueError): video_to_images("./test_video_in.avi", "./test_frames", end_sec=-1.5)
+        with self.assertRaises(ValueError): video_to_images("./test_video_in.avi", "./test_frames", end_sec=4)
+        with self.assertRaises(ValueError): video_to_images("./test_video_in.avi", "./test_frames", start_sec=3)
+        self.assertEqual(glob("./test_frames/*"), [])
+
+        # 10 fps -> frame 10 to 19, every 3rd frame
+        video_to_images("./test_video_in.avi", "./test_frames", ".npy", save_every_nth_frame=3, start_sec=1, end_sec=2)
+        saved = sorted(int(os.path.basename(p)[:-4]) for p in glob("./test_frames/*.npy"))
+        self.assertEqual(saved, [10, 13, 16, 19])
+
+        video_to_images("./test_video_in.avi", "./test_frames", ".jpg", jpg_quality=50)
+        self.assertEqual(len(glob("./test_frames/*.jpg")), 30)
+
+        [os.remove(p) for p in glob("./test_frames/*")]
+        os.rmdir("./test_frames")
+        os.remove("./test_video_in.avi")
+
+
+    def test_get_frames_from_video(self):
+        self.make_test_video("./test_video_in.avi", frames=200)
+        with self.assertRaises(ValueError): get_frames_from_video("./test_video_in.avi", [-1])
+        with self.assertRaises(TypeError): get_frames_from_video("./test_video_in.avi", [1.0])
+        with self.assertRaises(RuntimeError): get_frames_from_video("./test_video_in.avi", [250])
+
+        # Every frame `i` has the pixel value `i`
+        indices = [150, 3, 3, 0, 199, 120]
+        frames = get_frames_from_video("./test_video_in.avi", indices)
+        self.assertEqual([int(frame.mean()) for frame in frames], indices)
+        self.assertEqual(int(get_frame_from_video("./test_video_in.avi").mean()), 0)
+
+        os.remove("./test_video_in.avi")
+
+
+    def test_get_videos_info(self):
+        self.make_test_video("./test_video_in.avi", frames=20)
+        with self.assertRaises(ValueError): get_videos_info(["./not_a_video.avi"])
+        with self.assertRaises(ValueError): get_videos_info(["./test_video_in.avi"], cache_path="./cache.txt")
+
+        info = get_video_info("./test_video_in.avi")
+        self.assertEqual((info["width"], info["height"], info["frame_count"], info["fps"]), (64, 48, 20, 10))
+
+        # The second call is served from the cache
+        infos = get_videos_info(["./test_video_in.avi", "./test_video_in.avi"], cache_path="./test_cache.json")
+        self.assertEqual(infos, [info, info])
+        self.assertEqual(len(read_json("./test_cache.json")), 1)
+        self.assertEqual(get_videos_info(["./test_video_in.avi"], cache_path="./test_cache.json"), [info])
+
+        # A failing probe is raised, but only after the successful ones have been cached
+        import dutils.videos as videos_module
+        self.make_test_video("./test_video_corrupt.avi", frames=10)
+        self.make_test_video("./test_video_other.avi", frames=30)
+        probe, probed = videos_module._video_info_from_path, []
+        def failing_probe(path):
+            probed.append(path)
+            if "corrupt" in path:
+                raise RuntimeError("corrupt")
+            return probe(path)
+        videos_module._video_info_from_path = failing_probe
+        try:
+            paths = ["./test_video_corrupt.avi", "./test_video_other.avi"]
+            with self.assertRaisesRegex(RuntimeError, "test_video_corrupt.avi"):
+                get_videos_info(paths, cache_path="./test_cache.json")
+            self.assertEqual(len(read_json("./test_cache.json")), 2)
+
+            # Only the file that failed is probed again
+            probed.clear()
+            with self.assertRaises(RuntimeError): get_videos_info(paths, cache_path="./test_cache.json")
+            self.assertEqual(probed, ["./test_video_corrupt.avi"])
+        finally:
+            videos_module._video_info_from_path = probe
+        self.assertEqual(get_videos_info(paths, cache_path="./test_cache.json")[1]["frame_count"], 30)
+
+        os.remove("./test_cache.json")
+        os.remove("./test_video_in.avi")
+        os.remove("./test_video_corrupt.avi")
+        os.remove("./test_video_other.avi")
+
+
+    def test_frame_store(self):
+        self.make_test_video("./test_video_in.avi", frames=20)
+        with self.assertRaises(ValueError): FrameStore("./test_video_in.avi")
+
+        store = FrameStore.create("./test_video_in.avi", "./test_store.frames", every_nth_frame=2)
+        with self.assertRaises(ValueError): FrameStore.create("./test_video_in.avi", "./test_store.frames")
+        with self.assertRaises(ValueError): store.get_frames(5, 11)
+
+        self.assertEqual((len(store), store.shape, store.fps), (10, (10, 48, 64, 3), 5.0))
+        self.assertEqual([int(frame.mean()) for frame in store.get_frames(0, 10)], list(range(0, 20, 2)))
+        self.assertEqual(store[3].flags.writeable, False)
+
+        reopened = FrameStore("./test_store.frames")
+        self.assertEqual((reopened[9] == store[9]).all(), True)
+
+        del store, reopened # Release the memory maps, otherwise the file cannot be removed on Windows
+        os.remove("./test_store.frames")
+        os.remove("./test_video_in.avi")
+
+
+    def test_images_to_video(self):
+        os.mkdir("./test_images")
+        paths = [f"./test_images/{i}.png" for i in range(4)]
+        [cv2.imwrite(p, np.full((48, 64, 3), 100, dtype=np.uint8)) for p in paths[:3]]
+        cv2.imwrite(paths[3], np.full((96, 32, 3), 200, dtype=np.uint8)) # Different size and aspect ratio
+
+        with self.assertRaises(ValueError): images_to_video(paths, "./test_video_out.mp4", mismatch="crop")
+        with self.assertRaises(ValueError): images_to_video(paths, "./test_video_out.mp4", prefetch=0)
+        with self.assertRaises(ValueError): images_to_video(paths, "./test_video_out.mp4")
+        os.remove("./test_video_out.mp4")
+
+        for mismatch, expected_mean in [("resize", 200), ("letterbox", 50)]:
+            images_to_video(paths, "./test_video_out.mp4", fps=10, mismatch=mismatch, workers=2, prefetch=2)
+            info = get_video_info("./test_video_out.mp4")
+            self.assertEqual((info["width"], info["height"], info["frame_count"]), (64, 48, 4))
+            self.assertAlmostEqual(get_frames_from_video("./test_video_out.mp4", [3])[0].mean(), expected_mean, delta=10)
+            os.remove("./test_video_out.mp4")
+
+        [os.remove(p) for p in paths]
+        os.rmdir("./test_images")
+
+
+    def test_run_frame_pipeline(self):
+        with self.assertRaises(ValueError): run_frame_pipeline(range(3), abs, print, workers=0)
+        with self.assertRaises(TypeError): run_frame_pipeline(range(3), "not callable", print)
+
+        # Items must come out in the order they went in, even though they are processed in parallel
+        results = []
+        self.assertEqual(run_frame_pipeline(range(500), lambda x: x * 2, results.append, 4, 8), 500)
+        self.assertEqual(results, [x * 2 for x in range(500)])
+
+        # By default `process` runs in a single thread, one item at a time, so stateful callbacks are safe
+        import threading
+        threads, running_sum = set(), [0]
+        def stateful(x):
+            threads.add(threading.get_ident())
+            running_sum[0] += x
+            return running_sum[0]
+        results = []
+        run_frame_pipeline(range(200), stateful, results.append)
+        self.assertEqual(len(threads), 1)
+        self.assertEqual(results, np.cumsum(range(200)).tolist())
+
+        # Errors in any of the 3 stages are passed on to the caller
+        def failing_producer():
+            yield 1
+            raise KeyError("producer")
+        with self.assertRaises(KeyError): run_frame_pipeline(failing_producer(), abs, results.append)
+        with self.assertRaises(ZeroDivisionError): run_frame_pipeline(range(10), lambda x: 1 / x, results.append)
+        with self.assertRaises(IndexError): run_frame_pipeline(range(10), abs, lambda x: [][x])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=1)
 
@@ -4,6 +4,15 @@ import requests as _requests
 import cv2 as _cv2
 import warnings as _warnings
 import matplotlib.pyplot as _plt
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from collections import OrderedDict as _OrderedDict, deque as _deque
+import threading as _threading
+import functools as _functools
+import time as _time
+import os as _os
+import zlib as _zlib
+import hashlib as _hashlib
+import io as _io
 
 from . import type_check as _type_check
 from . import colors as _colors
@@ -103,28 +112,312 @@ def pillow_image_to_ndarray(image: _Image.Image, RGB2BGR: bool = True):
     return as_ndarray if not RGB2BGR else _cv2.cvtColor(as_ndarray, _cv2.COLOR_RGB2BGR)
 
 
+def _read_tiff_tags(data:bytes, offset:int, tags:tuple) -> dict:
+    """
+    Read the integer values of `tags` from the first IFD of the TIFF structure which starts at `offset` in `data`.
+    Used for both TIFF files and the EXIF segment of JPEGs, which reuses the TIFF layout
+    """
+    byte_order = {b"II": "little", b"MM": "big"}.get(data[offset:offset + 2])
+    if byte_order is None:
+        return {}
+    u16 = lambda i: int.from_bytes(data[i:i + 2], byte_order)
+    u32 = lambda i: int.from_bytes(data[i:i + 4], byte_order)
+
+    found = {}
+    ifd = offset + u32(offset + 4)
+    for i in range(u16(ifd) if ifd + 2 <= len(data) else 0):
+        entry = ifd + 2 + 12 * i
+        if entry + 12 > len(data):
+            break
+        tag, value_type = u16(entry), u16(entry + 2)
+        if tag in tags:
+            found[tag] = u16(entry + 8) if value_type == 3 else u32(entry + 8) # 3 = SHORT, 4 = LONG
+    return found
+
+
+def _read_jpeg_frame_header(file):
+    """
+    Walk the JPEG markers in `file` (positioned right after the SOI marker) until the Start Of Frame segment.
+    Shared by `_jpeg_size_from_file()` and `_is_greyscale_file()`.
+
+    @param file: Binary file object, or `io.BytesIO` for images which are already in memory
+    @return: (width, height, number of components, EXIF orientation) or None if the markers are malformed or truncated
+    """
+    orientation = 1
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] == 0xFF: # Fill byte
+            file.seek(-1, 1)
+            continue
+        if marker[1] == 0x01 or 0xD0 <= marker[1] <= 0xD8: # Markers without a length
+            continue
+
+        length = file.read(2)
+        if len(length) < 2:
+            return None
+        length = int.from_bytes(length, "big")
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            segment = file.read(6) # Precision, height, width and number of components
+            if len(segment) < 6: # Truncated file
+                return None
+            height, width = int.from_bytes(segment[1:3], "big"), int.from_bytes(segment[3:5], "big")
+            return width, height, segment[5], orientation
+        elif marker[1] == 0xE1:
+            segment = file.read(length - 2)
+            if segment[:6] == b"Exif\x00\x00":
+                orientation = _read_tiff_tags(segment, 6, (0x0112,)).get(0x0112, orientation)
+        else:
+            file.seek(length - 2, 1)
+
+
+def _jpeg_size_from_file(file):
+    """
+    Return the (width, height) of the JPEG in `file` or None if its header cannot be understood.
+    EXIF orientation is taken into account the same way `cv2.imread` does, i.e. rotated images have width and height swapped
+    """
+    file.seek(2)
+    header = _read_jpeg_frame_header(file)
+    if header is None:
+        return None
+    width, height, _, orientation = header
+    return (height, width) if orientation in (5, 6, 7, 8) else (width, height)
+
+
+def _image_size_from_header(path:str):
+    """
+    Parse (width, height) from the header of a PNG, JPEG, BMP, GIF, TIFF or WebP image without decoding any pixels.
+    Return None if the format is not recognized or the header could not be understood.
+    """
+    with open(path, "rb") as file:
+        head = file.read(64)
+
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            return int.from_bytes(head[16:20], "big"), int.from_bytes(head[20:24], "big")
+
+        if head[:2] == b"\xff\xd8":
+            return _jpeg_size_from_file(file)
+
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return int.from_bytes(head[6:8], "little"), int.from_bytes(head[8:10], "little")
+
+        if head[:2] == b"BM" and len(head) >= 26:
+            if int.from_bytes(head[14:18], "little") == 12: # BITMAPCOREHEADER
+                return int.from_bytes(head[18:20], "little"), int.from_bytes(head[20:22], "little")
+            width = int.from_bytes(head[18:22], "little", signed=True)
+            height = int.from_bytes(head[22:26], "little", signed=True) # Negative for top-down bitmaps
+            return abs(width), abs(height)
+
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+            chunk = head[12:16]
+            if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+                return int.from_bytes(head[26:28], "little") & 0x3FFF, int.from_bytes(head[28:30], "little") & 0x3FFF
+            if chunk == b"VP8L" and head[20] == 0x2F:
+                bits = int.from_bytes(head[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+            return None
+
+        if head[:4] in (b"II*\x00", b"MM\x00*"):
+            # The first IFD is often written after the pixel data, so jump straight to it and
+            # present it to `_read_tiff_tags` as if it directly followed the 8 byte TIFF header
+            byte_order = "little" if head[:2] == b"II" else "big"
+            file.seek(int.from_bytes(head[4:8], byte_order))
+            ifd = file.read(2)
+            ifd += file.read(12 * int.from_bytes(ifd, byte_order))
+            tags = _read_tiff_tags(head[:4] + (8).to_bytes(4, byte_order) + ifd, 0, (256, 257)) # Width, Length
+            return (tags[256], tags[257]) if len(tags) == 2 else None
+
+    return None
+
+
 def image_size_from_path(path:str, WxH=True):
-    """ Return image size in width x height or vice versa """
+    """
+    Return image size in width x height or vice versa.
+    PNG, JPEG, BMP, GIF, TIFF and WebP sizes are read from the file header without decoding the image,
+    any other format (or unusual header) falls back to a full decode with cv2.
+    """
     _input_output.assert_path(path)
     _type_check.assert_type(WxH, bool)
 
-    height, width = _cv2.imread(path).shape[:2]
+    size = _image_size_from_header(path)
+    if size is None:
+        height, width = _cv2.imread(path).shape[:2]
+    else:
+        width, height = size
     return (width, height) if WxH else (height, width)
 
 
-def get_image_from_url(url: str, return_type: str = "cv2"):
+def image_sizes_from_paths(paths:list, WxH=True, workers:int=8):
+    """
+    Bulk version of `image_size_from_path()`. The headers are read by a pool of `workers` threads.
+
+    EXAMPLE:
+    >> image_sizes_from_paths(glob("./dataset/**/*.jpg", recursive=True), workers=16)
+    [(1920, 1080), (1080, 1920), ...]
+
+    @param paths: Image paths
+    @param WxH: If True return sizes as (width, height) otherwise as (height, width)
+    @param workers: Number of threads
+    @return: List with the size of every image in `paths`
+    """
+    _type_check.assert_types([paths, WxH, workers], [list, bool, int])
+    _type_check.assert_list_slow(paths, str)
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda path: image_size_from_path(path, WxH), paths))
+
+
+_URL_TIMEOUT = 30.0 # Seconds to wait for a connection and for each chunk of data from an image URL
+_url_session = None
+_url_session_pool_size = 0
+_url_session_lock = _threading.Lock()
+
+
+def _get_url_session(pool_size:int=10) -> _requests.Session:
+    """
+    Return the `requests.Session` shared by all image downloads, which keeps connections to a host alive between images.
+    The session is created on first use. If `pool_size` calls for a larger connection pool, a larger adapter is mounted
+    on the same session and the old one is closed, so its connections are not leaked.
+    """
+    global _url_session, _url_session_pool_size
+    with _url_session_lock:
+        if _url_session is None:
+            _url_session = _requests.Session()
+        if _url_session_pool_size < pool_size:
+            old_adapters = {id(adapter): adapter for adapter in _url_session.adapters.values()}.values()
+            adapter = _requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _url_session.mount("http://", adapter)
+            _url_session.mount("https://", adapter)
+            for old_adapter in old_adapters:
+                old_adapter.close() # Connections which are in use are closed once they are released
+            _url_session_pool_size = pool_size
+        return _url_session
+
+
+def _url_cache_paths(cache_dir:str, url:str) -> tuple:
+    """
+    The on-disk image cache is content-addressed: every download is stored once under the sha256 of its bytes
+    (`<cache_dir>/objects/<sha256>`), and `<cache_dir>/urls/<sha256 of url>` holds the content hash of each url.
+    """
+    url_key = _hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return _os.path.join(cache_dir, "urls", url_key), _os.path.join(cache_dir, "objects")
+
+
+def _atomic_write(path:str, data:bytes) -> None:
+    """ Write `data` to `path` such that other threads/processes never see a partially written file """
+    _os.makedirs(_os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{_os.getpid()}.{_threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    _os.replace(temp_path, path)
+
+
+def _fetch_url(url:str, timeout:float=_URL_TIMEOUT, cache_dir:str=None, session:_requests.Session=None) -> bytes:
+    """
+    Download the body of `url` as a stream through the shared session, or read it from `cache_dir` if it's there.
+    NOTE: This function is only intended to be used by the URL image loaders
+    """
+    if cache_dir is not None:
+        url_path, objects_dir = _url_cache_paths(cache_dir, url)
+        try:
+            with open(url_path, "r") as f:
+                with open(_os.path.join(objects_dir, f.read().strip()), "rb") as f_object:
+                    return f_object.read()
+        except FileNotFoundError:
+            pass
+
+    session = _get_url_session() if (session is None) else session
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        data = b"".join(response.iter_content(chunk_size=1 << 16))
+
+    if cache_dir is not None:
+        content_key = _hashlib.sha256(data).hexdigest()
+        object_path = _os.path.join(objects_dir, content_key)
+        if not _os.path.exists(object_path):
+            _atomic_write(object_path, data)
+        _atomic_write(url_path, content_key.encode("utf-8"))
+    return data
+
+
+def _decode_url_image(data:bytes, return_type:str):
+    """
+    Decode downloaded image bytes into a Pillow image or a BGR np.ndarray.
+    NOTE: This function is only intended to be used by the URL image loaders
+    """
+    image = _Image.open(_io.BytesIO(data))
+    image.load() # Decode now, i.e. in the calling (worker) thread
+    if return_type == "pillow":
+        return image
+    if image.mode not in ["RGB", "RGBA"]:
+        image = image.convert("RGB")
+    return pillow_image_to_ndarray(image)
+
+
+def get_image_from_url(url: str, return_type: str = "cv2", timeout: float = _URL_TIMEOUT):
     """
     Fetch and return image in the format specified by `return_type` from URL.
     Note that no checks are performed on the `url`
+
+    @param url: URL pointing to an image
+    @param return_type: "cv2" (BGR np.ndarray) or "pillow"
+    @param timeout: Seconds to wait for a connection and for each chunk of data
     """
     # Checks
-    _type_check.assert_types([url, return_type], [str, str])
+    _type_check.assert_types([url, return_type, timeout], [str, str, (int, float)])
     if return_type not in ["pillow", "cv2"]:
         raise ValueError(f"Expected `return_type` to be in ['pillow', 'cv2'], but received `{return_type}`")
 
     # Download, open and return image
-    image = _Image.open(_requests.get(url, stream=True).raw)
-    return image if (return_type == "pillow") else pillow_image_to_ndarray(image)
+    return _decode_url_image(_fetch_url(url, timeout), return_type)
+
+
+def get_images_from_urls(urls: list, return_type: str = "cv2", workers: int = 8, timeout: float = _URL_TIMEOUT,
+                         cache_dir: str = None, skip_errors: bool = False) -> list:
+    """
+    Fetch many images concurrently. Connections are pooled and reused, bodies are streamed
+    and the images are decoded in the worker threads.
+
+    EXAMPLE:
+    >> images = get_images_from_urls(urls, workers=16, cache_dir="./image_cache")
+
+    @param urls: List of URLs pointing to images
+    @param return_type: "cv2" (BGR np.ndarray) or "pillow"
+    @param workers: Number of threads (and pooled connections) used to download and decode
+    @param timeout: Seconds to wait for a connection and for each chunk of data
+    @param cache_dir: If not None, downloads are stored in (and later read from) this folder.
+                      Identical images from different URLs are only stored once
+    @param skip_errors: If True, images which cannot be downloaded or decoded are warned about and returned as None.
+                        If False, the first error is raised
+    @return: List of images in the same order as `urls`
+    """
+    # Checks
+    _type_check.assert_types(
+        to_check=[urls, return_type, workers, timeout, cache_dir, skip_errors],
+        expected_types=[(list, tuple), str, int, (int, float), str, bool],
+        allow_nones=[0, 0, 0, 0, 1, 0]
+    )
+    _type_check.assert_list_slow(list(urls), str)
+    _type_check.assert_in(return_type, ["pillow", "cv2"])
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+
+    session = _get_url_session(workers)
+
+    def get_image(url:str):
+        try:
+            return _decode_url_image(_fetch_url(url, timeout, cache_dir, session), return_type)
+        except (_requests.RequestException, OSError) as e: # Pillow's decoding errors are OSErrors
+            if not skip_errors:
+                raise
+            _warnings.warn(f"Failed to get image from `{url}`: {e}")
+            return None
+
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(get_image, urls))
 
 
 def ndarray_image_to_pillow(image: _np.ndarray, BGR2RGB: bool = True):
@@ -174,12 +467,11 @@ def show_image_from_path(path: str, resize_factor: float = 1.0):
 
     # If inside a jupyter environment Pillow is ued to show the image, otherwise cv2.
     if _jupyter.in_jupyter():
-        image = _Image.open(path)
-        image = pillow_resize_image(image, resize_factor)
-        display(image)
+        image = _cached_image(path, "pillow", resize_factor, lambda: _load_pillow_array(path, resize_factor))
+        display(_Image.fromarray(image))
     else:
-        image = _cv2.imread(path)
-        image = ndarray_resize_image(image, resize_factor)
+        loader = lambda: ndarray_resize_image(_cv2.imread(path), resize_factor)
+        image = _cached_image(path, "bgr", resize_factor, loader)
         show_ndarray_image(image)
 
 
@@ -348,44 +640,603 @@ def cv2_draw_bounding_boxes(image: _np.ndarray, p1: tuple, p2: tuple, label: str
         _cv2.putText(image, text, (p1[0], p1[1] - 2), _cv2.FONT_HERSHEY_DUPLEX, 0.5, color, 1, _cv2.LINE_AA)
 
 
-def load_image(path: str, load_type: str = "unchanged"):
+def _assert_boxes(boxes:_np.ndarray) -> None:
+    """ Assert `boxes` is a (N, 4) numerical array """
+    _type_check.assert_type(boxes, _np.ndarray)
+    if (boxes.ndim != 2) or (boxes.shape[1] != 4):
+        raise ValueError(f"Expected `boxes` to have shape (N, 4), but received shape `{boxes.shape}`")
+    if not (_np.issubdtype(boxes.dtype, _np.integer) or _np.issubdtype(boxes.dtype, _np.floating)):
+        raise ValueError(f"Expected `boxes` to be of an integer or float dtype, but received `{boxes.dtype}`")
+
+
+def _as_float_boxes(boxes:_np.ndarray) -> _np.ndarray:
+    """ Keep float32/float64 as is and turn everything else into float64 """
+    return boxes if _np.issubdtype(boxes.dtype, _np.floating) else boxes.astype(_np.float64)
+
+
+def xywhn_to_xyxy(boxes:_np.ndarray, image_width:int, image_height:int, clip:bool=False) -> _np.ndarray:
+    """
+    Convert YOLO boxes (normalized center x, center y, width, height) to pixel corners (x1, y1, x2, y2).
+
+    EXAMPLE:
+    >> xywhn_to_xyxy(np.array([[0.5, 0.5, 0.2, 0.4]]), 200, 100)
+    array([[ 80.,  30., 120.,  70.]])
+
+    @param boxes: np.ndarray with shape (N, 4)
+    @param image_width: Width of the image in pixels
+    @param image_height: Height of the image in pixels
+    @param clip: If True, clip the corners to the image i.e. x in [0, image_width-1] and y in [0, image_height-1]
+    @return: np.ndarray with shape (N, 4), float32 if `boxes` is float32 else float64
+    """
+    _type_check.assert_types([image_width, image_height, clip], [int, int, bool])
+    _assert_boxes(boxes)
+    boxes = _as_float_boxes(boxes)
+
+    xyxy = _np.empty_like(boxes)
+    half_wh = boxes[:, 2:] / 2
+    _np.subtract(boxes[:, :2], half_wh, out=xyxy[:, :2])
+    _np.add(boxes[:, :2], half_wh, out=xyxy[:, 2:])
+    xyxy *= _np.array([image_width, image_height, image_width, image_height], dtype=xyxy.dtype)
+    if clip:
+        _np.clip(xyxy[:, 0::2], 0, image_width - 1, out=xyxy[:, 0::2])
+        _np.clip(xyxy[:, 1::2], 0, image_height - 1, out=xyxy[:, 1::2])
+    return xyxy
+
+
+def xyxy_to_xywhn(boxes:_np.ndarray, image_width:int, image_height:int) -> _np.ndarray:
+    """
+    Convert pixel corners (x1, y1, x2, y2) to YOLO boxes (normalized center x, center y, width, height).
+
+    EXAMPLE:
+    >> xyxy_to_xywhn(np.array([[80, 30, 120, 70]]), 200, 100)
+    array([[0.5, 0.5, 0.2, 0.4]])
+
+    @param boxes: np.ndarray with shape (N, 4)
+    @param image_width: Width of the image in pixels
+    @param image_height: Height of the image in pixels
+    @return: np.ndarray with shape (N, 4), float32 if `boxes` is float32 else float64
+    """
+    _type_check.assert_types([image_width, image_height], [int, int])
+    _assert_boxes(boxes)
+    boxes = _as_float_boxes(boxes)
+
+    xywhn = _np.empty_like(boxes)
+    _np.subtract(boxes[:, 2:], boxes[:, :2], out=xywhn[:, 2:])
+    _np.add(boxes[:, :2], xywhn[:, 2:] / 2, out=xywhn[:, :2])
+    xywhn /= _np.array([image_width, image_height, image_width, image_height], dtype=xywhn.dtype)
+    return xywhn
+
+
+def xywh_to_xyxy(boxes:_np.ndarray) -> _np.ndarray:
+    """
+    Convert pixel boxes given as left upper corner, width and height to pixel corners (x1, y1, x2, y2).
+
+    EXAMPLE:
+    >> xywh_to_xyxy(np.array([[80, 30, 40, 40]]))
+    array([[ 80,  30, 120,  70]])
+
+    @param boxes: np.ndarray with shape (N, 4)
+    @return: np.ndarray with shape (N, 4) and the same dtype as `boxes`
+    """
+    _assert_boxes(boxes)
+    xyxy = boxes.copy()
+    xyxy[:, 2:] += boxes[:, :2]
+    return xyxy
+
+
+def xyxy_to_xywh(boxes:_np.ndarray) -> _np.ndarray:
+    """
+    Convert pixel corners (x1, y1, x2, y2) to pixel boxes given as left upper corner, width and height.
+
+    EXAMPLE:
+    >> xyxy_to_xywh(np.array([[80, 30, 120, 70]]))
+    array([[80, 30, 40, 40]])
+
+    @param boxes: np.ndarray with shape (N, 4)
+    @return: np.ndarray with shape (N, 4) and the same dtype as `boxes`
+    """
+    _assert_boxes(boxes)
+    xywh = boxes.copy()
+    xywh[:, 2:] -= boxes[:, :2]
+    return xywh
+
+
+_yolo_label_dtype = _np.dtype([("image_id", _np.uint32), ("class", _np.uint16), ("box", _np.float32, (4,))])
+
+
+def _parse_yolo_label_files(paths:list) -> tuple:
+    """
+    Parse a chunk of YOLO label files, each made of `class x_mid y_mid width height` lines.
+    The files are read and validated line by line, but all tokens are converted with a single `np.array` call.
+    NOTE: This function is only intended to be used by `read_yolo_labels()`
+
+    @return: (rows, counts) where `rows` is a (N, 5) float32 array and `counts` the number of rows of each file
+    """
+    tokens, counts = [], []
+    for path in paths:
+        with open(path, "rb") as f:
+            lines = f.read().splitlines()
+        count = 0
+        for line_number, line in enumerate(lines, start=1):
+            line_tokens = line.split()
+            if not line_tokens:
+                continue
+            if len(line_tokens) != 5:
+                raise ValueError(f"`{path}` line {line_number} has {len(line_tokens)} values, "
+                                 f"expected lines like `class x_mid y_mid w h`")
+            tokens.extend(line_tokens)
+            count += 1
+        counts.append(count)
+
+    try:
+        values = _np.array(tokens, dtype=_np.float32)
+    except ValueError:
+        # Only pay for locating the offending line when something is actually wrong
+        for path in paths:
+            with open(path, "rb") as f:
+                for line_number, line in enumerate(f.read().splitlines(), start=1):
+                    try:
+                        [float(token) for token in line.split()]
+                    except ValueError:
+                        raise ValueError(f"`{path}` line {line_number} has non numerical values, "
+                                         f"expected lines like `class x_mid y_mid w h`") from None
+        raise
+    return values.reshape(-1, 5), counts
+
+
+def read_yolo_labels(labels, workers:int=8, chunk_size:int=1024) -> tuple:
+    """
+    Read an entire YOLO labels directory into one compact structured array.
+    Each row holds `image_id` (uint32), `class` (uint16) and `box` (4 x float32, xywhn), i.e. 22 bytes per box.
+    The boxes of image `i` are `records[offsets[i]:offsets[i+1]]`, images without any boxes are kept as empty ranges.
+
+    EXAMPLE:
+    >> records, offsets, paths = read_yolo_labels("./dataset/labels")
+    >> records[offsets[7]:offsets[8]]["box"] # All boxes of `paths[7]`
+    >> np.bincount(records["class"]) # Class distribution
+
+    @param labels: Folder with YOLO .txt label files or a list of paths to label files
+    @param workers: Number of threads used to read the files
+    @param chunk_size: Number of files each thread reads and parses in one go
+    @return: (records, offsets, paths), `offsets` has len(paths) + 1 elements and `image_id` is the index into `paths`
+    """
+    # Checks
+    _type_check.assert_types([labels, workers, chunk_size], [(str, list, tuple), int, int])
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+    _type_check.assert_comparison_number(chunk_size, 1, ">=", "chunk_size")
+    if isinstance(labels, str):
+        _input_output.assert_path(labels)
+        paths = sorted(_os.path.join(labels, name) for name in _os.listdir(labels) if name.endswith(".txt"))
+    else:
+        paths = list(labels)
+
+    # Read and parse the files in parallel, one chunk of files at a time
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+        parsed = list(executor.map(_parse_yolo_label_files, chunks))
+
+    counts = _np.array([count for _, chunk_counts in parsed for count in chunk_counts], dtype=_np.int64)
+    offsets = _np.zeros(len(paths) + 1, dtype=_np.int64)
+    _np.cumsum(counts, out=offsets[1:])
+
+    # Pack everything into a single structured array
+    rows = _np.concatenate([rows for rows, _ in parsed]) if parsed else _np.empty((0, 5), dtype=_np.float32)
+    classes = rows[:, 0]
+    if len(rows) and ((classes.min() < 0) or (classes.max() > _np.iinfo(_np.uint16).max) or
+                      (classes != _np.round(classes)).any()):
+        raise ValueError("Expected all YOLO class labels to be integers in the range 0-65535")
+
+    records = _np.empty(len(rows), dtype=_yolo_label_dtype)
+    records["image_id"] = _np.repeat(_np.arange(len(paths), dtype=_np.uint32), counts)
+    records["class"] = classes
+    records["box"] = rows[:, 1:]
+    return records, offsets, paths
+
+
+def _boxes_to_pixel_xyxy(boxes:_np.ndarray, box_format:str, width:int, height:int) -> _np.ndarray:
+    """
+    Convert (N, 4) `boxes` in `box_format` to integer pixel corners (x1, y1, x2, y2) clipped to the image.
+    NOTE: This function is only intended to be used by `draw_bounding_boxes()`
+    """
+    if box_format == "xywhn":
+        xyxy = xywhn_to_xyxy(boxes, width, height)
+    elif box_format == "xywh":
+        xyxy = xywh_to_xyxy(boxes)
+    else:
+        xyxy = boxes
+
+    xyxy = _np.rint(xyxy).astype(_np.int32)
+    _np.clip(xyxy[:, 0::2], 0, width - 1, out=xyxy[:, 0::2])
+    _np.clip(xyxy[:, 1::2], 0, height - 1, out=xyxy[:, 1::2])
+    return xyxy
+
+
+@_functools.lru_cache(maxsize=4096)
+def _text_size(text:str, font_scale:float, thickness:int) -> tuple:
+    """ Cached `cv2.getTextSize`, labels tend to repeat a lot from one frame to the next """
+    (text_width, text_height), baseline = _cv2.getTextSize(text, _cv2.FONT_HERSHEY_DUPLEX, font_scale, thickness)
+    return text_width, text_height, baseline
+
+
+def draw_bounding_boxes(image:_np.ndarray, boxes:_np.ndarray, labels=None, confs=None, colors=None,
+                        box_format:str="xyxy", line_thickness:int=2, font_scale:float=0.5, inplace:bool=True):
+    """
+    Draw many bounding boxes at once. Everything is validated and converted once for the whole batch of boxes,
+    boxes sharing a color are drawn with a single `cv2.polylines` call and text sizes are cached across calls.
+
+    EXAMPLE:
+    >> draw_bounding_boxes(frame, np.array([[438, 140, 822, 583], [10, 10, 50, 80]]), ["Cat", "Dog"], [0.7, 0.35])
+    >> draw_bounding_boxes(frame, yolo_boxes, class_names, box_format="xywhn", inplace=False)
+
+    @param image: Image in np.ndarray format
+    @param boxes: np.ndarray with shape (N, 4) in the format specified by `box_format`
+    @param labels: None or N labels e.g. ["Cat", "Dog"]. Anything which isn't a str (e.g. class ids) is passed to str()
+    @param confs: None or N confidence scores (0-1)
+    @param colors: None, a single color or N colors (must adhere to `color_helpers`'s format requirements e.g. "hex").
+                   If None, every label gets its own color
+    @param box_format: "xyxy" (pixel corners), "xywh" (pixel left upper corner, width, height)
+                       or "xywhn" (YOLO i.e. normalized center x, center y, width, height)
+    @param line_thickness: Line thickness of the BBs
+    @param font_scale: Size of the label text
+    @param inplace: If False, the boxes are drawn on a copy of `image`
+    @return: The image with the boxes drawn on it
+    """
+
+    # Checks
+    _type_check.assert_types(
+        to_check=[image, boxes, box_format, line_thickness, font_scale, inplace],
+        expected_types=[_np.ndarray, _np.ndarray, str, int, float, bool]
+    )
+    assert_ndarray_image(image)
+    _type_check.assert_in(box_format, ["xyxy", "xywh", "xywhn"])
+    _assert_boxes(boxes)
+    for name, values in [("labels", labels), ("confs", confs)]:
+        if (values is not None) and (len(values) != len(boxes)):
+            raise ValueError(f"Expected `{name}` to have {len(boxes)} elements, one per box, but received {len(values)}")
+
+    if not inplace:
+        image = image.copy()
+    if not len(boxes):
+        return image
+
+    # Colors, converted once per distinct color rather than once per box
+    if colors is None:
+        palette = _colors.get_color_scheme("seaborn", "rgb")
+        if labels is None:
+            box_colors = [tuple(palette[0])] * len(boxes)
+        else:
+            # Hash the label so it keeps its color from one image/frame to the next
+            label_to_color = {str(label): tuple(palette[_zlib.crc32(str(label).encode()) % len(palette)])
+                              for label in set(labels)}
+            box_colors = [label_to_color[str(label)] for label in labels]
+    elif _colors.get_color_type(colors) is not None:
+        box_colors = [tuple(_colors.convert_color(colors, "rgb"))] * len(boxes)
+    else:
+        if isinstance(colors, _np.ndarray):
+            colors = colors.tolist()
+        if len(colors) != len(boxes):
+            raise ValueError(f"Expected `colors` to be a single color or {len(boxes)} colors, one per box")
+        converted = {}
+        box_colors = [converted.setdefault(str(c), tuple(_colors.convert_color(c, "rgb"))) for c in colors]
+
+    # Draw all boxes of the same color in one go
+    h, w = image.shape[:2]
+    xyxy = _boxes_to_pixel_xyxy(boxes, box_format, w, h)
+    corners = xyxy[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+    for color in set(box_colors):
+        indexes = [i for i, c in enumerate(box_colors) if c == color]
+        _cv2.polylines(image, list(corners[indexes]), True, color, line_thickness)
+
+    # Draw text and confidence score
+    if (labels is None) and (confs is None):
+        return image
+    for i, (x1, y1, _, _) in enumerate(xyxy.tolist()):
+        text = str(labels[i]) if labels is not None else ""
+        if confs is not None:
+            if text: text += ": "
+            text += str(round(float(confs[i]) * 100, 3)) + "%"
+        text_width, text_height, baseline = _text_size(text, font_scale, 1)
+
+        # Put the label above the box if there's room for it, otherwise inside
+        top = y1 - text_height - baseline if (y1 - text_height - baseline >= 0) else y1
+        color = box_colors[i]
+        text_color = (0, 0, 0) if (0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2]) > 150 else (255, 255, 255)
+        _cv2.rectangle(image, (x1, top), (x1 + text_width, top + text_height + baseline), color, -1)
+        _cv2.putText(image, text, (x1, top + text_height), _cv2.FONT_HERSHEY_DUPLEX, font_scale, text_color, 1,
+                     _cv2.LINE_AA)
+    return image
+
+
+class ImageCache:
+    """
+    Thread safe LRU cache of decoded images with a memory budget of `max_megabytes`.
+    Entries are keyed by (path, modification time, load type, resize), so an image is decoded again if its file changes.
+    The cached arrays are read-only, copy them if they need to be modified.
+
+    The cache is opt-in and shared by `load_image()`, `load_images()`, `show_image_from_path()`
+    and `jupyter_ipython.show_image()`, see `enable_image_cache()`
+
+    EXAMPLE:
+    >> cache = enable_image_cache(max_megabytes=1024)
+    >> for epoch in range(10):
+    >>     images = load_images(paths, "rgb")
+    >> cache.stats()
+    {'hits': 9000, 'misses': 1000, 'evictions': 0, 'entries': 1000, 'megabytes': 263.4, 'max_megabytes': 1024.0}
+    """
+
+    def __init__(self, max_megabytes:float=512.0):
+        _type_check.assert_type(max_megabytes, (float, int))
+        if max_megabytes <= 0:
+            raise ValueError(f"`max_megabytes` must be positive, but received `{max_megabytes}`")
+
+        self.max_bytes = int(max_megabytes * 2**20)
+        self._entries = _OrderedDict()
+        self._bytes = 0
+        self._lock = _threading.Lock()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+
+    def get_or_load(self, path:str, load_type:str, resize, loader) -> _np.ndarray:
+        """
+        Return the cached image for (`path`, `load_type`, `resize`) or call `loader()` and cache its result.
+        `loader` is called outside the lock, so several threads can decode different images at the same time.
+        """
+        key = (_os.path.abspath(path), _os.stat(path).st_mtime_ns, load_type, resize)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        image = loader()
+        image.setflags(write=False)
+        if image.nbytes > self.max_bytes:
+            return image
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = image
+                self._bytes += image.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+        return image
+
+
+    def clear(self):
+        """ Remove all cached images, the statistics are kept """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+    def stats(self) -> dict:
+        """ Return hit/miss statistics and the current memory usage """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "megabytes": round(self._bytes / 2**20, 2),
+                    "max_megabytes": round(self.max_bytes / 2**20, 2)}
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __str__(self):
+        return f"ImageCache({self.stats()})"
+
+
+_image_cache = None
+
+
+def enable_image_cache(max_megabytes:float=512.0) -> ImageCache:
+    """
+    Turn on the decoded image cache used by `load_image()`, `load_images()`, `show_image_from_path()`
+    and `jupyter_ipython.show_image()`. NOTE: while enabled, these functions return read-only arrays.
+
+    @param max_megabytes: Memory budget of the cache, the least recently used images are evicted beyond it
+    @return: The new `ImageCache`, use `.stats()` on it to see hits and misses
+    """
+    global _image_cache
+    _image_cache = ImageCache(max_megabytes)
+    return _image_cache
+
+
+def disable_image_cache() -> None:
+    """ Turn off the decoded image cache and release its memory """
+    global _image_cache
+    _image_cache = None
+
+
+def _cached_image(path:str, load_type:str, resize, loader) -> _np.ndarray:
+    """ Go through the image cache if it is enabled, otherwise just call `loader()` """
+    cache = _image_cache
+    return loader() if cache is None else cache.get_or_load(path, load_type, resize, loader)
+
+
+def _thumbnail_size(size:tuple, resize_factor:float, max_size:int) -> tuple:
+    """
+    Width and height of an image of `size` after resizing it by `resize_factor`,
+    but to no more than `max_size` pixels along its longest side.
+    """
+    scale = min(resize_factor, max_size / max(size))
+    return max(1, int(size[0] * scale)), max(1, int(size[1] * scale))
+
+
+def _load_pillow_array(path:str, resize_factor:float=1.0, max_size:int=None) -> _np.ndarray:
+    """
+    Open `path` with Pillow and return it as an np.ndarray in RGB(A) or greyscale.
+    If `max_size` is not None, the image is shrunk to at most `max_size` pixels along its longest side. JPEGs are then
+    decoded directly at reduced size (DCT scaling, the same trick as cv2's `IMREAD_REDUCED_*`).
+    NOTE: This function is only intended to be used by the image cache users, which store arrays rather than Pillow images
+    """
+    image = _Image.open(path)
+    if max_size is not None:
+        size = _thumbnail_size(image.size, resize_factor, max_size)
+        image.draft(image.mode, size) # Changes `image.size` to something in between the original and `size`
+    if image.mode not in ["L", "RGB", "RGBA"]:
+        has_alpha = ("A" in image.getbands()) or ("transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    if max_size is not None:
+        if image.size != size:
+            image = image.resize(size, resample=_Image.BOX)
+    elif resize_factor != 1.0:
+        image = pillow_resize_image(image, resize_factor)
+    return _np.asarray(image)
+
+
+_LOAD_TYPES = {"grey": _cv2.IMREAD_GRAYSCALE,
+               "gray": _cv2.IMREAD_GRAYSCALE,
+               "rgb": _cv2.IMREAD_COLOR,
+               "bgr": _cv2.IMREAD_COLOR,
+               "unchanged": _cv2.IMREAD_UNCHANGED}
+
+# cv2 can decode JPEGs (and to a lesser extent other formats) directly at 1/2, 1/4 or 1/8 resolution
+_REDUCED_LOAD_TYPES = {
+    (_cv2.IMREAD_GRAYSCALE, 2): _cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (_cv2.IMREAD_GRAYSCALE, 4): _cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (_cv2.IMREAD_GRAYSCALE, 8): _cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    (_cv2.IMREAD_COLOR, 2): _cv2.IMREAD_REDUCED_COLOR_2,
+    (_cv2.IMREAD_COLOR, 4): _cv2.IMREAD_REDUCED_COLOR_4,
+    (_cv2.IMREAD_COLOR, 8): _cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def _get_imread_flag(load_type:str, reduce:int=1) -> int:
+    """
+    Translate `load_type` and `reduce` into a cv2.imread flag.
+    NOTE: This function is only intended to be used by `load_image()` and `load_images()`
+    """
+    _type_check.assert_types([load_type, reduce], [str, int])
+    if load_type.lower() not in _LOAD_TYPES:
+        raise ValueError(f"Expected `load_type` to be in `{list(_LOAD_TYPES.keys())}`,"
+                         f"but received `{load_type}`")
+    _type_check.assert_in(reduce, [1, 2, 4, 8])
+
+    flag = _LOAD_TYPES[load_type.lower()]
+    if reduce == 1:
+        return flag
+    if flag == _cv2.IMREAD_UNCHANGED:
+        raise ValueError("`reduce` is not supported together with `load_type='unchanged'`")
+    return _REDUCED_LOAD_TYPES[(flag, reduce)]
+
+
+def _is_greyscale_file(data:bytes):
+    """
+    Determine if the encoded image in `data` is single channel greyscale by looking at its header.
+    Return None if the header is not understood, in which case the caller has to decode the image to find out.
+    """
+    # PNG: The color type is stored at a fixed position in the IHDR chunk
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) > 25:
+        return data[25] == 0
+
+    # JPEG: The Start Of Frame segment holds the number of components. It can be preceded by a lot of EXIF/APPn data,
+    # so the markers are walked over the entire buffer (`BytesIO` doesn't copy `bytes`)
+    if data[:2] == b"\xff\xd8":
+        file = _io.BytesIO(data)
+        file.seek(2)
+        header = _read_jpeg_frame_header(file)
+        return None if (header is None) else (header[2] == 1)
+
+    return None
+
+
+def _decode_image(path:str, load_type:str, flag:int):
+    """
+    Read `path` exactly once and decode it according to `flag`.
+    NOTE: This function is only intended to be used by `load_image()` and `load_images()`
+    """
+    with open(path, "rb") as f:
+        encoded = f.read()
+    data = _np.frombuffer(encoded, dtype=_np.uint8)
+
+    if load_type in ["rgb", "bgr"]:
+        is_greyscale = _is_greyscale_file(encoded)
+        if is_greyscale is None:
+            decoded = _cv2.imdecode(data, _cv2.IMREAD_UNCHANGED)
+            is_greyscale = (decoded is not None) and (len(decoded.shape) == 2)
+        if is_greyscale:
+            _warnings.warn(f"`{path}` is a greyscale image, but received `load_type = {load_type}`"
+                          f"Will return a greyscale image in RGB format i.e. R = G = B")
+
+    image = _cv2.imdecode(data, flag)
+    if image is None:
+        raise ValueError(f"Failed to decode image `{path}`")
+    if load_type == "rgb":
+        image = _cv2.cvtColor(image, _cv2.COLOR_BGR2RGB)
+
+    return image
+
+
+def load_image(path: str, load_type: str = "unchanged", reduce:int=1):
     """
     Load an image in np.ndarray format. Support grayscale, RGB, BGR, RGBA and BGRA
 
     @param path: Image path
     @param load_type: Image format that will be return
                       Legal values (case insensitive) : ['grey', 'gray', 'rgb', 'bgr', 'unchanged']
+    @param reduce: Decode the image at 1/`reduce` resolution, which is much faster than a full decode + resize.
+                   Must be in [1, 2, 4, 8]. Not supported together with `load_type='unchanged'`
     @return: Image at `path` in the format specified by `load_type`
 
     """
 
-    # Simple Checks
+    # Checks
     _type_check.assert_type(path, str)
     _input_output.assert_path(path)
+    flag = _get_imread_flag(load_type, reduce)
+    load_type = load_type.lower()
+
+    return _cached_image(path, load_type, reduce, lambda: _decode_image(path, load_type, flag))
+
 
-    # Check load_type
-    legal_load_types = {"grey": _cv2.IMREAD_GRAYSCALE,
-                        "gray": _cv2.IMREAD_GRAYSCALE,
-                        "rgb": _cv2.IMREAD_COLOR,
-                        "bgr": _cv2.IMREAD_COLOR,
-                        "unchanged": _cv2.IMREAD_UNCHANGED}
+def load_images(paths:list, load_type:str="unchanged", workers:int=8, reduce:int=1, stack:bool=False):
+    """
+    Load several images in np.ndarray format with a pool of `workers` threads.
+    cv2 releases the GIL while decoding, so this scales well with the number of cores.
 
+    EXAMPLE:
+    >> batch = load_images(sorted(glob("./frames/*.jpg")), "rgb", workers=8, reduce=2, stack=True)
+    >> batch.shape
+    (1000, 540, 960, 3)
+
+    @param paths: Image paths
+    @param load_type: Image format that will be return, see `load_image()`
+    @param workers: Number of threads used for decoding
+    @param reduce: Decode the images at 1/`reduce` resolution, see `load_image()`
+    @param stack: If True, return a single np.ndarray of shape (len(paths), *image.shape) instead of a list.
+                  Raise ValueError if the images don't have the same shape
+    @return: List of images or a stacked np.ndarray if `stack` is True
+    """
+
+    # Checks
+    _type_check.assert_types([paths, load_type, workers, stack], [list, str, int, bool])
+    _type_check.assert_list_slow(paths, str)
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+    [_input_output.assert_path(path) for path in paths]
+    flag = _get_imread_flag(load_type, reduce)
     load_type = load_type.lower()
-    if load_type not in legal_load_types:
-        raise ValueError(f"Expected `load_type` to be in `{list(legal_load_types.keys())}`,"
-                         f"but received `{load_type}`")
 
-    if load_type in ["rgb", "bgr"]:
-        if len(_cv2.imread(path, _cv2.IMREAD_UNCHANGED).shape) == 2:
-            _warnings.warn(f"`{path}` is a greyscale image, but received `load_type = {load_type}`"
-                          f"Will return a greyscale image in RGB format i.e. R = G = B")
+    decode = lambda path: _cached_image(path, load_type, reduce, lambda: _decode_image(path, load_type, flag))
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+        images = executor.map(decode, paths)
+        if not stack:
+            return list(images)
 
-    # Load image
-    image = _cv2.imread(path, legal_load_types[load_type])
-    if load_type == "rgb":
-        image = _cv2.cvtColor(image, _cv2.COLOR_BGR2RGB)
+        # The output is allocated once the first image is known, every other image is then copied straight into it
+        batch = None
+        for i, image in enumerate(images):
+            if batch is None:
+                batch = _np.empty((len(paths),) + image.shape, dtype=image.dtype)
+            if image.shape != batch.shape[1:] or image.dtype != batch.dtype:
+                raise ValueError(f"Cannot stack images of different shapes, `{paths[i]}` has shape {image.shape} "
+                                 f"while `{paths[0]}` has shape {batch.shape[1:]}")
+            batch[i] = image
 
-    return image
+    return batch if batch is not None else _np.empty((0,), dtype=_np.uint8)
 
 
 # Add unit tests
@@ -421,6 +1272,39 @@ def rotate_image(img: _np.ndarray, rotate_angle: int):
     return _cv2.rotate(img, rotate_by) if (rotate_by is not None) else img
 
 
+class _ImageFolderSource:
+    """ Frame source which reads the images in a folder in sorted order, mimics `cv2.VideoCapture.read()` """
+
+    def __init__(self, folder_path:str):
+        extensions = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+        self.paths = sorted(_os.path.join(folder_path, name) for name in _os.listdir(folder_path)
+                            if name.lower().endswith(extensions))
+        self.index = 0
+
+    def read(self):
+        if self.index >= len(self.paths):
+            return False, None
+        self.index += 1
+        return True, _cv2.imread(self.paths[self.index - 1])
+
+    def release(self):
+        self.index = len(self.paths)
+
+
+class _IterableSource:
+    """ Frame source which wraps any iterable of np.ndarray frames, mimics `cv2.VideoCapture.read()` """
+
+    def __init__(self, frames):
+        self.frames = iter(frames)
+
+    def read(self):
+        frame = next(self.frames, None)
+        return frame is not None, frame
+
+    def release(self):
+        self.frames = iter(())
+
+
 class Cv2Webcam:
     """
     A simple class that makes it easier to work with frames captured by webcam.
@@ -430,6 +1314,17 @@ class Cv2Webcam:
       where the current frame can be accessed through self.image, manipulated and then returned for displaying
     * Quit on `q`
     * Save frame on `space`
+    * Frames don't have to come from a webcam. `webcam` can also be a video file, a folder with images
+      or any iterable (e.g. a generator or a list) of np.ndarray frames. A bare np.ndarray is not accepted
+    * Frames returned by `on_update` don't have to be shown in a window. `sink` can also be a video path (.mp4 or .avi),
+      any callable which accepts a frame, or "null" to discard them. Key presses are only handled with `sink="window"`
+    * With `threaded=True` frames are captured by a dedicated thread into a buffer of `buffer_size` frames,
+      so a slow `on_update` doesn't stall the camera and the newest frames are processed instead of stale ones.
+      `drop_policy` decides what happens when the buffer is full:
+        "oldest" -> discard the oldest buffered frame (lowest latency, the default)
+        "newest" -> discard the frame which was just captured
+        "block"  -> wait for `on_update` to catch up, no frames are dropped
+    * `benchmark()` runs the same loop headless and as fast as possible, and reports per stage latencies
 
     EXAMPLE:
     class Cam(Cv2Webcam):
@@ -437,51 +1332,250 @@ class Cv2Webcam:
             new_frame = cv2.resize(self.frame, (512,512))
             return new_frame
 
-    new_cam = Cam()
+    new_cam = Cam(threaded=True)
     new_cam.start()
+    new_cam.get_stats()
+    {'capture_fps': 30.0, 'processing_fps': 12.5, 'captured_frames': 300, 'processed_frames': 125, 'dropped_frames': 175}
+
+    Cam("./recording.mp4", sink="./processed.mp4").start()
+    Cam("./recording.mp4").benchmark()["on_update"]
+    {'mean': 4.1, 'p50': 3.9, 'p90': 5.2, 'p99': 7.8, 'max': 9.3}
     """
 
 
-    def __init__(self, webcam:int=0, show_fps:bool=True):
-        _type_check.assert_types([webcam, show_fps], [int, bool])
+    def __init__(self, webcam=0, show_fps:bool=True, threaded:bool=False, buffer_size:int=1,
+                 drop_policy:str="oldest", sink="window"):
+        _type_check.assert_types([show_fps, threaded, buffer_size, drop_policy], [bool, bool, int, str])
+        _type_check.assert_comparison_number(buffer_size, 1, ">=", "buffer_size")
+        _type_check.assert_in(drop_policy, ["oldest", "newest", "block"])
+        if isinstance(webcam, bool) or not (isinstance(webcam, (int, str)) or hasattr(webcam, "__iter__")):
+            raise TypeError(f"Expected `webcam` to be a webcam index, a path or an iterable of frames, "
+                            f"but received type `{type(webcam)}`")
+        if isinstance(webcam, _np.ndarray):
+            # Iterating an ndarray yields its rows, which would silently be treated as frames
+            raise TypeError(f"Received `webcam` as a np.ndarray of shape {webcam.shape}, which is ambiguous. "
+                            f"Use `[image]` for a single frame or `list(frames)` for a stack of frames")
+        if isinstance(sink, str) and sink not in ["window", "null"] and not sink.lower().endswith((".mp4", ".avi")):
+            raise ValueError(f"Expected `sink` to be 'window', 'null', a .mp4/.avi path or a callable, "
+                             f"but received `{sink}`")
+        if not isinstance(sink, str) and not callable(sink):
+            raise TypeError(f"Expected `sink` to be a str or a callable, but received type `{type(sink)}`")
+
         self.webcam = webcam
+        self.sink = sink
         self.frame = None
         self.video_feed = None
         self.is_live = None
         self.show_fps = show_fps
         self.fps_timer = _time_and_date.FPSTimer(precision_decimals=1)
+        self._video_writer = None
+        self._stage_timings = None
+        self._max_frames = None
+
+        # Asynchronous capture
+        self.threaded = threaded
+        self.buffer_size = buffer_size
+        self.drop_policy = drop_policy
+        self.capture_fps_timer = _time_and_date.FPSTimer(precision_decimals=1)
+        self.dropped_frames = 0
+        self._buffer = _deque()
+        self._buffer_condition = _threading.Condition()
+        self._capture_thread = None
+        self._capture_done = False
 
 
     def start(self):
         """ Start webcam, fps_timer and main loop """
         self.is_live = True
-        self.video_feed = _cv2.VideoCapture(self.webcam)
+        self.video_feed = self._open_source()
+        self.fps_timer.reset()
         self.fps_timer.start()
-        self._on_update()
+        if self.threaded:
+            self._start_capture_thread()
+        try:
+            self._on_update()
+        finally:
+            self.stop()
+
+
+    def stop(self):
+        """ Stop the main loop and the capture thread and release the webcam """
+        self.is_live = False
+        with self._buffer_condition:
+            self._buffer_condition.notify_all()
+        if self._capture_thread is not None:
+            self._capture_thread.join()
+            self._capture_thread = None
+        if self.video_feed is not None:
+            self.video_feed.release()
+        if self._video_writer is not None:
+            self._video_writer.release()
+            self._video_writer = None
+
+
+    def benchmark(self, max_frames:int=None, percentiles:tuple=(50, 90, 99)) -> dict:
+        """
+        Run the main loop headless (a "window" sink is replaced by "null") over all frames of `webcam`
+        as fast as possible, and report the latency of every stage in milliseconds.
+        The stages are "read" (waiting for the next frame), "on_update" and "sink" (fps overlay + output).
+
+        @param max_frames: Stop after this many frames, None means all of them. Use it for endless sources like webcams
+        @param percentiles: The latency percentiles which are reported for every stage
+        @return: dict with the number of frames, the overall fps and a dict of latency statistics per stage
+        """
+        _type_check.assert_types([max_frames, percentiles], [int, (tuple, list)], [1, 0])
+        if max_frames is not None:
+            _type_check.assert_comparison_number(max_frames, 1, ">=", "max_frames")
+
+        original_sink = self.sink
+        self.sink = "null" if self.sink == "window" else self.sink
+        self._stage_timings = {"read": [], "on_update": [], "sink": []}
+        self._max_frames = max_frames
+        start_time = _time.perf_counter()
+        try:
+            self.start()
+            elapsed = _time.perf_counter() - start_time
+            timings = self._stage_timings
+        finally:
+            self.sink, self._stage_timings, self._max_frames = original_sink, None, None
+
+        frames = len(timings["on_update"])
+        report = {"frames": frames, "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0}
+        for stage, latencies in timings.items():
+            latencies = _np.array(latencies) * 1000 if frames else _np.zeros(1)
+            stats = {"mean": round(float(latencies.mean()), 3)}
+            for q, value in zip(percentiles, _np.percentile(latencies, percentiles)):
+                stats[f"p{q}"] = round(float(value), 3)
+            stats["max"] = round(float(latencies.max()), 3)
+            report[stage] = stats
+        return report
+
+
+    def get_stats(self) -> dict:
+        """ Return capture and processing fps together with frame counts. Capture stats are only tracked when threaded """
+        return {"capture_fps": self.capture_fps_timer.get_fps() if self.threaded else None,
+                "processing_fps": self.fps_timer.get_fps(),
+                "captured_frames": self.capture_fps_timer.get_frame_count() if self.threaded else None,
+                "processed_frames": self.fps_timer.get_frame_count(),
+                "dropped_frames": self.dropped_frames}
+
+
+    def _open_source(self):
+        """ Return an object with the `read()` and `release()` interface of `cv2.VideoCapture` for `self.webcam` """
+        if isinstance(self.webcam, str) and _os.path.isdir(self.webcam):
+            return _ImageFolderSource(self.webcam)
+        elif isinstance(self.webcam, (int, str)):
+            return _cv2.VideoCapture(self.webcam)
+        return _IterableSource(self.webcam)
+
+
+    def _write_to_sink(self, frame:_np.ndarray):
+        """ Pass `frame` on to `self.sink` """
+        if self.sink == "window":
+            _cv2.imshow('frame', frame)
+        elif callable(self.sink):
+            self.sink(frame)
+        elif self.sink != "null":
+            if self._video_writer is None:
+                fps = self.video_feed.get(_cv2.CAP_PROP_FPS) if isinstance(self.video_feed, _cv2.VideoCapture) else 0
+                fourcc = _cv2.VideoWriter_fourcc(*("mp4v" if self.sink.lower().endswith(".mp4") else "MJPG"))
+                self._video_writer = _cv2.VideoWriter(self.sink, fourcc, fps or 30, frame.shape[1::-1])
+            self._video_writer.write(frame)
+
+
+    def _start_capture_thread(self):
+        self._buffer.clear()
+        self._capture_done = False
+        self.dropped_frames = 0
+        self.capture_fps_timer.reset()
+        self.capture_fps_timer.start()
+        self._capture_thread = _threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture_thread.start()
+
+
+    def _capture_loop(self):
+        """ Read frames into `self._buffer` as fast as the webcam delivers them, runs in its own thread """
+        try:
+            while self.is_live:
+                success, frame = self.video_feed.read()
+                if not success:
+                    break
+                self.capture_fps_timer.increment()
+
+                with self._buffer_condition:
+                    if len(self._buffer) >= self.buffer_size:
+                        if self.drop_policy == "newest":
+                            self.dropped_frames += 1
+                            continue
+                        elif self.drop_policy == "oldest":
+                            self._buffer.popleft()
+                            self.dropped_frames += 1
+                        else:
+                            while self.is_live and len(self._buffer) >= self.buffer_size:
+                                self._buffer_condition.wait()
+                    self._buffer.append(frame)
+                    self._buffer_condition.notify_all()
+        finally:
+            with self._buffer_condition:
+                self._capture_done = True
+                self._buffer_condition.notify_all()
+
+
+    def _next_frame(self):
+        """ Return the next frame to process or None if the frame source is exhausted """
+        if not self.threaded:
+            success, frame = self.video_feed.read()
+            return frame if success else None
+
+        with self._buffer_condition:
+            while not self._buffer and not self._capture_done and self.is_live:
+                self._buffer_condition.wait()
+            frame = self._buffer.popleft() if self._buffer else None
+            self._buffer_condition.notify_all() # Wake up the capture thread if it's blocked on a full buffer
+        return frame
 
 
     def _on_update(self):
         """ Main loop """
+        timings, max_frames = self._stage_timings, self._max_frames # Only used by `benchmark()`
         while self.is_live:
-            _, self.frame = self.video_feed.read()
+            stage_start = _time.perf_counter()
+            self.frame = self._next_frame()
+            if self.frame is None:
+                break
+            update_start = _time.perf_counter()
             frame = self.on_update()
+            sink_start = _time.perf_counter()
             _type_check.assert_type(frame, _np.ndarray, True)
 
 
             if frame is not None:
                 # Add fps if it's defined
                 if self.show_fps:
-                    _cv2.putText(frame, f"FPS: {self.fps_timer.get_fps()}", (10, 20),
-                                 _cv2.FONT_HERSHEY_DUPLEX, 0.5, (128, 128, 128), 1, _cv2.LINE_AA)
+                    text = f"FPS: {self.fps_timer.get_fps()}"
+                    if self.threaded:
+                        text += f" | Capture FPS: {self.capture_fps_timer.get_fps()} | Dropped: {self.dropped_frames}"
+                    _cv2.putText(frame, text, (10, 20), _cv2.FONT_HERSHEY_DUPLEX, 0.5, (128, 128, 128), 1,
+                                 _cv2.LINE_AA)
 
-                _cv2.imshow('frame', frame)
+                self._write_to_sink(frame)
 
+            if timings is not None:
+                timings["read"].append(update_start - stage_start)
+                timings["on_update"].append(sink_start - update_start)
+                timings["sink"].append(_time.perf_counter() - sink_start)
+
+            self.fps_timer.increment()
+            if (max_frames is not None) and (self.fps_timer.get_frame_count() >= max_frames):
+                break
+
+            if self.sink != "window":
+                continue
             pressed_key = _cv2.waitKey(1)
 
             # q pressed -> quit
             if pressed_key & 0xFF == ord('q'):
                 self.is_live = False
-                self.video_feed.release()
                 _cv2.destroyAllWindows()
 
             # Space pressed -> save frame
@@ -489,8 +1583,6 @@ class Cv2Webcam:
                 img_name = _pytorch.get_model_save_name("cv2_frame.png", separator=" ")
                 _cv2.imwrite(img_name, frame)
 
-            self.fps_timer.increment()
-
 
     def on_update(self):
         """
@@ -553,43 +1645,295 @@ def show_hist(image:_np.ndarray):
     _plt.show()
 
 
-def histogram_stretching(image:_np.ndarray, min_vd:int=0, max_vd:int=255):
-    # TODO: Write docstring
+def _prepare_out(out, shape:tuple) -> _np.ndarray:
+    """ Allocate the output of an image transform or check that the user provided `out` fits """
+    if out is None:
+        return _np.empty(shape, dtype=_np.uint8)
+    _type_check.assert_type(out, _np.ndarray)
+    if (out.shape != tuple(shape)) or (out.dtype != _np.uint8) or (not out.flags.c_contiguous):
+        raise ValueError(f"Expected `out` to be a C-contiguous uint8 np.ndarray with shape `{tuple(shape)}`, "
+                         f"but received dtype `{out.dtype}` and shape `{out.shape}`")
+    return out
+
+
+def apply_lut(image:_np.ndarray, table:_np.ndarray, out:_np.ndarray=None) -> _np.ndarray:
+    """
+    Map every pixel value in `image` through the lookup `table` i.e. `out = table[image]`.
+    This is the building block of point operations such as `gamma_correction()` and `histogram_stretching()`,
+    and works on single images as well as (N, H, W, C) batches.
+
+    EXAMPLE:
+    >> invert = 255 - np.arange(256, dtype=np.uint8)
+    >> apply_lut(frame, invert, out=frame) # Invert `frame` in-place
+
+    @param image: uint8 image or batch of images in np.ndarray format
+    @param table: uint8 np.ndarray with shape (256,) shared by all channels, or (256, C) with one table per channel
+    @param out: Optional preallocated C-contiguous uint8 output with the same shape as `image`. May be `image` itself
+    @return: The mapped image in np.ndarray format
+    """
     # Checks
-    _type_check.assert_types([image, min_vd, max_vd], [_np.ndarray, int, int])
-    assert_ndarray_image(image)
+    _type_check.assert_types([image, table], [_np.ndarray, _np.ndarray])
+    if image.dtype != _np.uint8:
+        raise TypeError(f"Expected `image` to be of dtype `uint8`, but received `{image.dtype}`")
+    per_channel = (table.ndim == 2)
+    if (table.dtype != _np.uint8) or (table.ndim not in [1, 2]) or (table.shape[0] != 256):
+        raise ValueError(f"Expected `table` to be a uint8 np.ndarray with shape (256,) or (256, C), "
+                         f"but received dtype `{table.dtype}` and shape `{table.shape}`")
+    if per_channel and ((image.ndim < 3) or (table.shape[1] != image.shape[-1])):
+        raise ValueError(f"A per channel `table` of shape `{table.shape}` doesn't match `image` of shape `{image.shape}`")
+    out = _prepare_out(out, image.shape)
+    if image.size == 0:
+        return out
+
+    # cv2.LUT is considerably faster than numpy, but only accepts 2D/3D arrays. Any C-contiguous array can be presented
+    # as one, a shared table as a (pixels, channels) single channel image and per channel tables as a (pixels, 1, C) one
+    if image.flags.c_contiguous and not per_channel:
+        _cv2.LUT(image.reshape(-1, image.shape[-1]), table, dst=out.reshape(-1, image.shape[-1]))
+    elif image.flags.c_contiguous:
+        channels = image.shape[-1]
+        _cv2.LUT(image.reshape(-1, 1, channels), table.reshape(256, 1, channels), dst=out.reshape(-1, 1, channels))
+    elif not per_channel:
+        _np.take(table, image, out=out)
+    else:
+        out[...] = table[image, _np.arange(image.shape[-1])]
+    return out
+
+
+def _histogram_stretching_tables(min_v, max_v, min_vd:int, max_vd:int) -> _np.ndarray:
+    """
+    Build the lookup table(s) which linearly map [`min_v`, `max_v`] onto [`min_vd`, `max_vd`].
+    `min_v` and `max_v` may be scalars or arrays, in which case the result has shape (*min_v.shape, 256).
+    Values outside [`min_v`, `max_v`] (e.g. after percentile clipping) are saturated to `min_vd` and `max_vd`
+    """
+    min_v = _np.asarray(min_v, dtype=_np.float64)[..., None]
+    max_v = _np.asarray(max_v, dtype=_np.float64)[..., None]
+    scaling_coef = (max_vd - min_vd) / _np.maximum(max_v - min_v, 1) # Constant images are mapped to `min_vd`
+    tables = scaling_coef * (_np.arange(256) - min_v) + min_vd
+    return _np.clip(_np.rint(tables), min_vd, max_vd).astype(_np.uint8)
+
+
+def _histogram_percentiles(histogram:_np.ndarray, low:float, high:float):
+    """ Return the pixel values at the `low` and `high` percentiles of a 256 bin `histogram` """
+    cdf = _np.cumsum(histogram)
+    return (int(_np.searchsorted(cdf, cdf[-1] * low / 100, side="right")),
+            int(_np.searchsorted(cdf, cdf[-1] * high / 100, side="left")))
 
-    min_v, max_v = _np.min(image), _np.max(image)
-    if min_v == 0:
+
+def histogram_stretching(image:_np.ndarray, min_vd:int=0, max_vd:int=255, per_channel:bool=False,
+                         percentiles:tuple=None, out:_np.ndarray=None):
+    """
+    Linearly stretch the pixel values of `image` from [min pixel value, max pixel value] to [`min_vd`, `max_vd`].
+    The mapping is computed as a 256 entry lookup table and applied with `apply_lut()`, so the result stays uint8.
+
+    EXAMPLE:
+    >> stretched = histogram_stretching(frame, per_channel=True, percentiles=(1, 99))
+
+    @param image: image in np.ndarray format
+    @param min_vd: The smallest pixel value after stretching
+    @param max_vd: The largest pixel value after stretching
+    @param per_channel: If True, stretch every color channel according to its own minimum and maximum
+    @param percentiles: If not None, e.g. (1, 99), the minimum and maximum are taken at these percentiles instead.
+                        Which makes the stretching robust against a few outliers, the pixels outside are saturated
+    @param out: Optional preallocated uint8 output with the same shape as `image`. Use `out=image` for in-place
+    @return: Histogram stretched image in np.ndarray format (uint8)
+    """
+    # Checks
+    _type_check.assert_types([image, min_vd, max_vd, per_channel, percentiles, out],
+                             [_np.ndarray, int, int, bool, (tuple, list), _np.ndarray], [0, 0, 0, 0, 1, 1])
+    assert_ndarray_image(image)
+    if not (0 <= min_vd < max_vd <= 255):
+        raise ValueError(f"Expected 0 <= `min_vd` < `max_vd` <= 255, but received `{min_vd}` and `{max_vd}`")
+    if (percentiles is not None) and ((len(percentiles) != 2) or not (0 <= percentiles[0] < percentiles[1] <= 100)):
+        raise ValueError(f"Expected `percentiles` to be (low, high) with 0 <= low < high <= 100, "
+                         f"but received `{percentiles}`")
+    per_channel = per_channel and not _is_ndarray_greyscale(image)
+
+    # Find the range of pixel values which is going to be stretched, either over the whole image or per channel
+    if (percentiles is None) and per_channel:
+        pixels = image.reshape(-1, image.shape[-1])
+        min_v, max_v = pixels.min(axis=0), pixels.max(axis=0)
+    elif percentiles is None:
+        min_v, max_v = image.min(), image.max()
+    else:
+        num_channels = 1 if (image.ndim == 2) else image.shape[2]
+        histograms = [_cv2.calcHist([image], [c], None, [256], [0, 256]).ravel() for c in range(num_channels)]
+        if per_channel:
+            min_v, max_v = _np.array([_histogram_percentiles(h, *percentiles) for h in histograms]).T
+        else:
+            min_v, max_v = _histogram_percentiles(_np.sum(histograms, axis=0), *percentiles)
+
+    if _np.any(min_v == 0):
         _warnings.warn("The minimum pixel value of `image` is 0 which may be problematic for histogram stretching"
                        "in the darker areas of the image")
-    if max_v == 255:
+    if _np.any(max_v == 255):
         _warnings.warn("The maximum pixel value of `image` is 255 which may be problematic for histogram stretching"
                        "in the brighter areas of the image")
 
-    scaling_coef = (max_vd - min_vd) / (max_v- min_v)
-    stretched_image = scaling_coef * (image-min_v) + min_vd
+    table = _histogram_stretching_tables(min_v, max_v, min_vd, max_vd)
+    table = table.T if per_channel else table
 
-    if (image == stretched_image).all():
+    # Identical output can be read directly from the table, instead of comparing the images pixel by pixel
+    identity = _np.arange(256)[:, None] if per_channel else _np.arange(256)
+    in_range = (identity >= min_v) & (identity <= max_v)
+    if _np.all((table == identity) | ~in_range):
         _warnings.warn("The input `image` and the histogram stretched version of `image` are identical i.e. no"
                        "transformation has taken place for whatever reason")
 
-    return stretched_image
+    return apply_lut(image, table, out)
+
+
+@_functools.lru_cache(maxsize=256)
+def _gamma_table(gamma:float) -> _np.ndarray:
+    """ Lookup table for `gamma_correction()`, cached so repeated calls with the same gamma are (almost) free """
+    table = (((_np.arange(256) / 255.0) ** gamma) * 255).astype(_np.uint8)
+    table.setflags(write=False)
+    return table
 
 
-def gamma_correction(image:_np.ndarray, gamma: float = 1.5):
+def gamma_correction(image:_np.ndarray, gamma: float = 1.5, out:_np.ndarray=None):
     """
     Perform gamma correction.
 
     @param image: image in np.ndarray format
     @param gamma: Essentially adjusting the brightness. Gamma < 1.0 -> brighter and gamma > 1.0 -> darker
+    @param out: Optional preallocated uint8 output with the same shape as `image`. Use `out=image` for in-place
     """
     # Checks
-    _type_check.assert_types([image, gamma], [_np.ndarray, float])
+    _type_check.assert_types([image, gamma, out], [_np.ndarray, float, _np.ndarray], [0, 0, 1])
+
+    return apply_lut(image, _gamma_table(gamma), out)
+
+
+def _assert_image_batch(images:_np.ndarray, color:bool=False):
+    """
+    Validate a batch of images once, instead of once per image like `assert_ndarray_image()`.
+    Expect a uint8 np.ndarray with shape (N, H, W, C) where C is 1, 3 or 4. Greyscale batches may also be (N, H, W).
+    """
+    _type_check.assert_type(images, _np.ndarray)
+    if images.dtype != _np.uint8:
+        raise TypeError(f"Expected `images` to be of dtype `uint8`, but received `{images.dtype}`")
+    if images.ndim not in [3, 4] or (images.ndim == 4 and images.shape[3] not in [1, 3, 4]):
+        raise ValueError(f"Expected `images` to have shape (N, H, W, C) with C in [1, 3, 4] or (N, H, W), "
+                         f"but received shape `{images.shape}`")
+    if color and (images.ndim == 3 or images.shape[3] == 1):
+        raise ValueError(f"Expected a batch of color images, but received shape `{images.shape}`")
+
+
+def ndarray_resize_image_batch(images:_np.ndarray, resize_factor:float, out:_np.ndarray=None) -> _np.ndarray:
+    """
+    Batch version of `ndarray_resize_image()`. Every image in `images` is resized by `resize_factor`
+
+    EXAMPLE:
+    >> small = ndarray_resize_image_batch(frames, 0.5) # (256, 1080, 1920, 3) -> (256, 540, 960, 3)
+
+    @param images: Batch of images in np.ndarray format with shape (N, H, W, C) or (N, H, W)
+    @param resize_factor: Rescale factor in percentage, e.g. 0.25 would decrease the resolution by 75%
+    @param out: Optional preallocated uint8 output with the resized shape, reused across calls to avoid allocations
+    @return: Resized batch in np.ndarray format
+    """
+    # Checks
+    _type_check.assert_types([resize_factor], [float])
+    _assert_image_batch(images)
+    if resize_factor < 0:
+        raise ValueError(f"`resize_factor` > 0, received value of {resize_factor}")
+
+    new_width = int(images.shape[2] * resize_factor)
+    new_height = int(images.shape[1] * resize_factor)
+    out = _prepare_out(out, (len(images), new_height, new_width) + images.shape[3:])
+
+    for image, out_image in zip(images, out):
+        _cv2.resize(image, (new_width, new_height), dst=out_image, interpolation=_cv2.INTER_AREA)
+    return out
+
+
+def rotate_image_batch(images:_np.ndarray, rotate_angle:int, out:_np.ndarray=None) -> _np.ndarray:
+    """
+    Batch version of `rotate_image()`. Rotate every image in `images` clockwise by `rotate_angle`.
+
+    @param images: Batch of images in np.ndarray format with shape (N, H, W, C) or (N, H, W)
+    @param rotate_angle: Degrees the images are rotated by. must be within [0, 90, -90, 180, -180, -270, 270, 360]
+    @param out: Optional preallocated uint8 output with the rotated shape. May be `images` itself for 0 and 180 degrees
+    @return: Rotated batch in np.ndarray format
+    """
+    # Number of counterclockwise quarter turns, as used by `np.rot90`
+    quarter_turns = {0: 0, 90: -1, -90: 1, 180: 2, -180: 2, -270: -1, 270: 1, 360: 0}
+
+    # Checks
+    _type_check.assert_type(rotate_angle, int)
+    _assert_image_batch(images)
+    if rotate_angle not in quarter_turns:
+        raise ValueError(f"`rotate_angle={rotate_angle}` is not valid. Legal values are: `{list(quarter_turns.keys())}`")
+
+    rotated = _np.rot90(images, quarter_turns[rotate_angle], axes=(1, 2)) # A view, no data is copied yet
+    out = _prepare_out(out, rotated.shape)
+    _np.copyto(out, rotated)
+    return out
+
+
+def gamma_correction_batch(images:_np.ndarray, gamma:float=1.5, out:_np.ndarray=None) -> _np.ndarray:
+    """
+    Batch version of `gamma_correction()`, the whole batch is passed through a single lookup table.
+
+    @param images: Batch of images in np.ndarray format with shape (N, H, W, C) or (N, H, W)
+    @param gamma: Essentially adjusting the brightness. Gamma < 1.0 -> brighter and gamma > 1.0 -> darker
+    @param out: Optional preallocated uint8 output with the same shape as `images`. May be `images` itself
+    @return: Gamma corrected batch in np.ndarray format
+    """
+    _type_check.assert_type(gamma, float)
+    _assert_image_batch(images)
+    out = _prepare_out(out, images.shape)
+
+    return apply_lut(images, _gamma_table(gamma), out)
+
+
+def histogram_stretching_batch(images:_np.ndarray, min_vd:int=0, max_vd:int=255,
+                               out:_np.ndarray=None) -> _np.ndarray:
+    """
+    Batch version of `histogram_stretching()`. Each image is stretched according to its own minimum and maximum
+    pixel value, but unlike `histogram_stretching()` no warnings are issued.
+
+    @param images: Batch of images in np.ndarray format with shape (N, H, W, C) or (N, H, W)
+    @param min_vd: The smallest pixel value after stretching
+    @param max_vd: The largest pixel value after stretching
+    @param out: Optional preallocated uint8 output with the same shape as `images`. May be `images` itself
+    @return: Histogram stretched batch in np.ndarray format
+    """
+    # Checks
+    _type_check.assert_types([min_vd, max_vd], [int, int])
+    _assert_image_batch(images)
+    if not (0 <= min_vd < max_vd <= 255):
+        raise ValueError(f"Expected 0 <= `min_vd` < `max_vd` <= 255, but received `{min_vd}` and `{max_vd}`")
+    out = _prepare_out(out, images.shape)
+
+    # One lookup table per image, all computed in one go
+    flat = images.reshape(len(images), -1)
+    tables = _histogram_stretching_tables(flat.min(axis=1), flat.max(axis=1), min_vd, max_vd)
+
+    for image, out_image, table in zip(images, out, tables):
+        apply_lut(image, table, out_image)
+    return out
+
+
+def ndarray_bgr2rgb_batch(images:_np.ndarray, out:_np.ndarray=None) -> _np.ndarray:
+    """
+    Batch version of `ndarray_bgr2rgb()`, convert every image in `images` from BGR -> RGB (or BGRA -> RGBA)
+
+    @param images: Batch of color images in np.ndarray format with shape (N, H, W, 3) or (N, H, W, 4)
+    @param out: Optional preallocated uint8 output with the same shape as `images`. May be `images` itself
+    @return: Converted batch in np.ndarray format
+    """
+    _assert_image_batch(images, color=True)
+    out = _prepare_out(out, images.shape)
+
+    code = _cv2.COLOR_BGR2RGB if images.shape[3] == 3 else _cv2.COLOR_BGRA2RGBA
+    for image, out_image in zip(images, out):
+        _cv2.cvtColor(image, code, dst=out_image)
+    return out
+
 
-    table = [((i / 255.0) ** gamma) * 255 for i in _np.arange(0, 256)]
-    table_right_format = _np.array(table).astype("uint8")
-    return _cv2.LUT(image, table_right_format)
+def ndarray_rgb2bgr_batch(images:_np.ndarray, out:_np.ndarray=None) -> _np.ndarray:
+    """ Batch version of `ndarray_rgb2bgr()`, convert every image in `images` from RGB -> BGR (or RGBA -> BGRA) """
+    return ndarray_bgr2rgb_batch(images, out) # Swapping red and blue is its own inverse
 
 
 __all__ = [
@@ -597,7 +1941,9 @@ __all__ = [
     "pillow_resize_image",
     "pillow_image_to_ndarray",
     "image_size_from_path",
+    "image_sizes_from_paths",
     "get_image_from_url",
+    "get_images_from_urls",
     "ndarray_image_to_pillow",
     "ndarray_resize_image",
     "show_image_from_path",
@@ -606,7 +1952,17 @@ __all__ = [
     "cv2_cutout_square",
     "cv2_sobel_edge_detection",
     "cv2_draw_bounding_boxes",
+    "draw_bounding_boxes",
+    "xywhn_to_xyxy",
+    "xyxy_to_xywhn",
+    "xywh_to_xyxy",
+    "xyxy_to_xywh",
+    "read_yolo_labels",
     "load_image",
+    "load_images",
+    "ImageCache",
+    "enable_image_cache",
+    "disable_image_cache",
     "rotate_image",
     "Cv2Webcam",
     "ndarray_bgr2rgb",
@@ -614,4 +1970,11 @@ __all__ = [
     "show_hist",
     "histogram_stretching",
     "gamma_correction",
+    "apply_lut",
+    "ndarray_resize_image_batch",
+    "rotate_image_batch",
+    "gamma_correction_batch",
+    "histogram_stretching_batch",
+    "ndarray_bgr2rgb_batch",
+    "ndarray_rgb2bgr_batch",
 ]
\ No newline at end of file
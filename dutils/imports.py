@@ -1,10 +1,12 @@
 import inspect as _inspect
 import os as _os
+import sys as _sys
 import types as _types
 import pathlib as _pathlib
+import json as _json
+import subprocess as _subprocess
 
 from . import type_check as _type_check
-from . import jupyter_ipython as _jupyter
 
 def get_imports(all_requests:list=None):
     """
@@ -12,6 +14,8 @@ def get_imports(all_requests:list=None):
     Expect `all_requests` to be in `["torch", "torchvision", "all_around", "all"]`
     and to be a list e.g. ["all"]
     """
+    from . import jupyter_ipython as _jupyter # Imported here, because `jupyter_ipython` imports torch, cv2 etc.
+
     if all_requests is None: all_requests = ["all_around"] # To avoid mutable default argument
     legal_imports = ["torch", "torchvision", "all_around", "all"]
 
@@ -91,11 +95,160 @@ def get_module_path(module:_types.ModuleType):
     return str(_pathlib.Path(module.__file__).resolve())
 
 
+# Executed in a fresh interpreter by `profile_import()`. Prints a single json line with the measurements.
+_PROFILE_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import dutils.{module} # NOTE: `-X importtime` does not log imports made through `importlib`
+wall_time = time.perf_counter() - start
+try:
+    import resource, sys
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss = peak_rss / 1024**2 if sys.platform == "darwin" else peak_rss / 1024 # bytes on macOS, kilobytes on linux
+except ImportError:
+    peak_rss = None # `resource` is not available on Windows
+print(json.dumps({{"wall_time_sec": wall_time, "peak_rss_mb": peak_rss}}))
+"""
+
+# Regressions smaller than this are considered noise, regardless of `tolerance`
+_MIN_REGRESSION_SEC = 0.05
+_MIN_REGRESSION_MB = 5.0
+
+
+def compare_import_profiles(report:dict, baseline:dict, tolerance:float=0.25) -> list:
+    """
+    Compare two reports made by `profile_import()` and return every module which has become slower
+    or more memory hungry than `baseline` by more than `tolerance`.
+
+    EXAMPLE:
+    >> compare_import_profiles(new_report, old_report, tolerance=0.25)
+    ['pytorch: wall_time_sec 1.2 -> 2.9']
+
+    @param report: The newest report
+    @param baseline: The report `report` is checked against
+    @param tolerance: Relative increase which is allowed e.g. 0.25 -> 25% slower is still ok
+    @return: list of human readable regressions. An empty list means no regressions was found
+    """
+    _type_check.assert_types([report, baseline, tolerance], [dict, dict, float])
+    _type_check.assert_comparison_number(tolerance, 0.0, ">=", "tolerance")
+
+    regressions = []
+    for module, new in report["modules"].items():
+        old = baseline["modules"].get(module)
+        if (old is None) or new["error"] or old["error"]:
+            continue
+
+        for key, min_increase in [("wall_time_sec", _MIN_REGRESSION_SEC), ("peak_rss_mb", _MIN_REGRESSION_MB)]:
+            if (new[key] is None) or (old[key] is None):
+                continue
+            if (new[key] > old[key] * (1 + tolerance)) and (new[key] - old[key] > min_increase):
+                regressions.append(f"{module}: {key} {round(old[key], 3)} -> {round(new[key], 3)}")
+
+    return regressions
+
+
+def profile_import(modules:list=None, save_path:str=None, baseline_path:str=None, tolerance:float=0.25) -> dict:
+    """
+    Import every public `dutils` module in a fresh interpreter and measure wall time,
+    peak memory use (RSS) and which third-party dependency (torch, cv2, pandas etc.) dominates the import.
+
+    EXAMPLE:
+    >> report = profile_import(save_path="./import_profile.json")
+    >> report["modules"]["images"]["dominant_dependency"]
+    'torch'
+    >> profile_import(baseline_path="./import_profile.json")["regressions"]
+    []
+
+    @param modules: Names of the modules that are profiled e.g. ["images", "videos"]. If None, every public module is used
+    @param save_path: If not None, the report is saved as .json at `save_path`
+    @param baseline_path: If not None, the report is checked against a previously saved report at `baseline_path`
+    @param tolerance: Relative increase in time/memory which is not considered a regression (see `compare_import_profiles`)
+    @return: report as a dict, the same one that is saved at `save_path`
+    """
+    from . import _module_index # Imported here to avoid a circular import
+
+    # Defined in here, so `get_available_functions(imports)` keeps listing exactly the public functions
+    def parse_import_time(stderr:str) -> dict:
+        """
+        Parse the output of `python -X importtime` and return the cumulative import time (in seconds)
+        of every third-party package. Standard library modules and `dutils` itself are ignored.
+        """
+        stdlib_names = set(getattr(_sys, "stdlib_module_names", []))
+        dependencies = {}
+        seen_dutils = False
+
+        for line in stderr.splitlines():
+            # Format: "import time:  self [us] | cumulative | imported package"
+            if not line.startswith("import time:") or line.count("|") != 2:
+                continue
+            _, cumulative, package = line[len("import time:"):].split("|")
+            top_level = package.strip().split(".")[0]
+
+            # Imports are printed when they finish, so everything before `dutils` itself is interpreter startup stuff
+            if package.strip() == "dutils":
+                seen_dutils = True
+            if (not seen_dutils) or (not cumulative.strip().isdigit()) or (top_level in stdlib_names) \
+                    or top_level.startswith("_") or (top_level == "dutils"):
+                continue
+
+            # The outermost import of a package has the largest cumulative time, which includes all of its sub-imports
+            seconds = int(cumulative) / 1e6
+            dependencies[top_level] = max(dependencies.get(top_level, 0.0), seconds)
+
+        return dict(sorted(dependencies.items(), key=lambda item: item[1], reverse=True))
+
+    # Checks
+    _type_check.assert_types([modules, save_path, baseline_path, tolerance], [list, str, str, float], [1, 1, 1, 0])
+    if modules is None:
+        modules = list(_module_index.keys())
+    for module in modules:
+        _type_check.assert_in(module, list(_module_index.keys()))
+    if (save_path is not None) and (save_path[-5:] != ".json"):
+        raise ValueError("Expected `save_path` to have a .json file extension, but received something else")
+    if baseline_path is not None:
+        _type_check.assert_type(baseline_path, str)
+        if not _os.path.isfile(baseline_path):
+            raise ValueError(f"Received bad path: `{baseline_path}`")
+
+    # Make sure the child interpreters import this exact version of `dutils`
+    env = dict(_os.environ)
+    package_parent = str(_pathlib.Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = _os.pathsep.join([package_parent] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+
+    report = {"python": _sys.version.split()[0], "platform": _sys.platform, "modules": {}, "regressions": []}
+    for module in modules:
+        cmd = [_sys.executable, "-X", "importtime", "-c", _PROFILE_SCRIPT.format(module=module)]
+        process = _subprocess.run(cmd, stdout=_subprocess.PIPE, stderr=_subprocess.PIPE, env=env, text=True)
+        dependencies = parse_import_time(process.stderr)
+
+        result = {"wall_time_sec": None, "peak_rss_mb": None, "dominant_dependency": None, "dependencies": dependencies,
+                  "error": None}
+        if process.returncode != 0:
+            error_lines = [l for l in process.stderr.splitlines() if l and not l.startswith("import time:")]
+            result["error"] = error_lines[-1] if error_lines else f"Exited with code {process.returncode}"
+        else:
+            result.update(_json.loads(process.stdout.strip().splitlines()[-1]))
+            result["dominant_dependency"] = next(iter(dependencies), None)
+        report["modules"][module] = result
+
+    if baseline_path is not None:
+        with open(baseline_path, "r") as f:
+            report["regressions"] = compare_import_profiles(report, _json.load(f), tolerance)
+
+    if save_path is not None:
+        with open(save_path, "w") as f:
+            _json.dump(report, f, indent=4)
+
+    return report
+
+
 __all__=[
     "get_imports",
     "get_available_functions",
     "get_all_available_import_classes",
-    "get_module_path"
+    "get_module_path",
+    "compare_import_profiles",
+    "profile_import",
 ]
 
 
@@ -7,9 +7,10 @@ import torch
 import PIL as _PIL
 from PIL import Image as _Image
 import numpy as _np
-import requests as _requests
+import io as _io
 import validators as _validators
-from rectpack import newPacker as _newPacker
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from rectpack import SORT_AREA as _SORT_AREA, MaxRectsBssf as _MaxRectsBssf, SkylineBlWm as _SkylineBlWm
 import warnings as _warnings
 import torch as _torch
 import re as _re
@@ -87,6 +88,28 @@ def play_audio(path:str, plot:bool=True):
         _plt.title(f"type: {audio_bar.mimetype} | duration: {duration} s | sample rate: {sample_rate}")
 
 
+# MaxRects packs the tightest, but its bookkeeping grows quadratically with the number of rectangles.
+# Above this many images the (almost as tight) skyline algorithm is used instead
+_MAX_RECTS_LIMIT = 100
+
+
+def _pack_rectangles(rectangles:list, canvas_dim:tuple, allow_rotations:bool):
+    """
+    Pack `rectangles` into a single bin of size `canvas_dim`, the same way a single bin `newPacker` would.
+    Contrary to `newPacker`, this gives up as soon as one rectangle doesn't fit.
+    NOTE: This function is only intended to be used by `_get_collage_image()`
+
+    @param rectangles: list of (height, width, index) tuples, already sorted
+    @return: The packed bin if all rectangles could fit, otherwise None
+    """
+    pack_algorithm = _MaxRectsBssf if (len(rectangles) <= _MAX_RECTS_LIMIT) else _SkylineBlWm
+    packed_bin = pack_algorithm(*canvas_dim, rot=allow_rotations)
+    for r in rectangles:
+        if packed_bin.add_rect(*r) is None:
+            return None
+    return packed_bin
+
+
 def _get_collage_image(images:list, allow_rotations:bool=False):
     """
     Used to pack `images` into a single image.
@@ -102,49 +125,65 @@ def _get_collage_image(images:list, allow_rotations:bool=False):
         cols, rows, resize_factor, _ = _get_grid_parameters(images)
         return _get_grid_image(images, cols, rows, resize_factor)
 
-    # Setup
-    rectangles = [(s.shape[0], s.shape[1], i) for i, s in enumerate(images)]
+    # Setup. The rectangles are sorted once (by area, same as rectpack's default) instead of once per packing attempt
+    rectangles = _SORT_AREA([(s.shape[0], s.shape[1], i) for i, s in enumerate(images)])
     height_domain = [60 * i for i in range(1, 8)] + [int(1080 * 8 / 1.05 ** i) for i in range(50, 0, -1)]
     width_domain = [100 * i for i in range(1, 8)] + [int(1920 * 8 / 1.05 ** i) for i in range(50, 0, -1)]
-    canvas_dims = list(zip(height_domain, width_domain)) # Just different sizes to try
-    canvas_image = None
-    max_x, min_y = -1, 1e6 # Used to crop the grey parts
-
-    # Attempt to pack all images into the smallest of the predefined width-height combinations
-    for canvas_dim in canvas_dims:
-
-        # Try packing
-        packer = _newPacker(rotation=allow_rotations)
-        for r in rectangles: packer.add_rect(*r)
-        packer.add_bin(*canvas_dim)
-        packer.pack()
-
-        # If all images couldn't fit, try with a larger image
-        if len(packer.rect_list()) != len(images):
-            continue
-
-        # Setup
-        canvas_image = _np.zeros((canvas_dim[0], canvas_dim[1], 3)).astype(_np.uint8) + 65 # 65 seems to be a pretty versatile grey color i.e. it looks decent no matter the pictures
-        H = canvas_image.shape[0]
-
-        for rect in packer[0]:
-            image = images[rect.rid]
-            h, w, y, x = rect.width, rect.height, rect.x, rect.y
+    canvas_dims = list(zip(height_domain, width_domain)) # Just different sizes to try. Both dims are increasing
+
+    # No canvas with less area than the images combined, or which is too small for the largest image, can work
+    total_area = sum(h * w for h, w, _ in rectangles)
+    if allow_rotations:
+        long_side = max(max(h, w) for h, w, _ in rectangles)
+        short_side = max(min(h, w) for h, w, _ in rectangles)
+        fits = lambda H, W: (min(H, W) >= short_side) and (max(H, W) >= long_side)
+    else:
+        max_h, max_w = max(h for h, _, _ in rectangles), max(w for _, w, _ in rectangles)
+        fits = lambda H, W: (H >= max_h) and (W >= max_w)
+    lo = next((i for i, (H, W) in enumerate(canvas_dims) if (H * W >= total_area) and fits(H, W)), len(canvas_dims))
+
+    # The smallest canvas everything can be packed into is usually a few sizes above `lo`, so gallop up from `lo`
+    # until a packing succeeds and then binary search between the last failure and the first success
+    hi, packers, step = len(canvas_dims) - 1, {}, 1
+    while lo < hi:
+        i = min(lo + step - 1, hi)
+        packers[i] = _pack_rectangles(rectangles, canvas_dims[i], allow_rotations)
+        if packers[i] is not None:
+            hi = i
+            break
+        lo, step = i + 1, step * 2
+    while lo < hi:
+        mid = (lo + hi) // 2
+        packers[mid] = _pack_rectangles(rectangles, canvas_dims[mid], allow_rotations)
+        if packers[mid] is None:
+            lo = mid + 1
+        else:
+            hi = mid
+    if (lo < len(canvas_dims)) and (lo not in packers):
+        packers[lo] = _pack_rectangles(rectangles, canvas_dims[lo], allow_rotations)
+    packer = packers.get(lo)
+    if packer is None:
+        raise RuntimeError("Failed to produce mosaic image. This is probably caused by to many and/or to large images")
 
-            # Transform origin to upper left corner
-            y = H - y - h
+    # Setup
+    canvas_dim = canvas_dims[lo]
+    canvas_image = _np.full((canvas_dim[0], canvas_dim[1], 3), 65, dtype=_np.uint8) # 65 seems to be a pretty versatile grey color i.e. it looks decent no matter the pictures
+    H = canvas_image.shape[0]
+    max_x, min_y = -1, 1e6 # Used to crop the grey parts
 
-            # Handle image rotations if necessary
-            if image.shape[:-1] != (h, w): image = image.transpose(1, 0, 2)
-            canvas_image[y:y+h, x:x+w, :] = image
+    for rect in packer:
+        image = images[rect.rid]
+        h, w, y, x = rect.width, rect.height, rect.x, rect.y
 
-            if max_x < (x+w): max_x = x+w
-            if min_y > y: min_y = y
+        # Transform origin to upper left corner
+        y = H - y - h
 
-        break
+        # Handle image rotations if necessary
+        if image.shape[:-1] != (h, w): image = image.transpose(1, 0, 2)
+        canvas_image[y:y+h, x:x+w, :] = image
 
-    if canvas_image is None:
-        raise RuntimeError("Failed to produce mosaic image. This is probably caused by to many and/or to large images")
+        if max_x < (x+w): max_x = x+w
+        if min_y > y: min_y = y
 
     if (max_x == -1) or (min_y == 1e6):
         raise RuntimeError("This should not be possible.")
@@ -175,29 +214,42 @@ def _get_grid_parameters(images, max_height=1080, max_width=1920, desired_ratio=
     N = len(images)
     h, w, _ = images[0].shape
     H, W = max_height, max_width
-
-    losses = {}
-    losses_split = []
-    for a in [0.05 + 0.01 * i for i in range(96)]:
-        for x in range(1, N + 1):
-            for y in range(1, N + 1):
-
-                # If the solution is not valid continue
-                if (h * a * y > H) or (w * a * x > W) or (x * y < N):
-                    continue
-                # Otherwise calculate loss
-                else:
-                    ratio_loss = abs((h * y) / (w * x) - desired_ratio) # (1)
-                    scale_loss = (1 - a) ** 2 # (2)
-                    empty_cell_loss = x*y/N - 1 # (3)
-                    losses[(y, x, a)] = ratio_loss + scale_loss + empty_cell_loss
-                    losses_split.append([ratio_loss, scale_loss, empty_cell_loss])
-
-    # pick parameters with the lowest loss
-    rl, sl, ecl = losses_split[_np.argmin(list(losses.values()))]
+    scales = 0.05 + 0.01 * _np.arange(96, dtype=_np.float64)
+
+    # Prune infeasible cols (x) and rows (y) up front. Both constraints are the loosest at the smallest scale
+    y_max = _np.minimum((H // (h * scales)).astype(_np.int64) + 1, N) # The largest valid y for every scale ...
+    while True: # ... which `//` is allowed to overshoot by one, so check with the exact same float expression
+        too_big = h * scales * y_max > H
+        if not too_big.any(): break
+        y_max[too_big] -= 1
+    x_max = int(min(N, W // (w * scales[0]) + 1))
+    while (x_max > 0) and (w * scales[0] * x_max > W):
+        x_max -= 1
+    if (x_max < 1) or (y_max[0] < 1) or (x_max * int(y_max[0]) < N):
+        raise ValueError(f"Cannot fit {N} images of shape {images[0].shape} into a {H}x{W} grid")
+    x = _np.arange(-(-N // int(y_max[0])), x_max + 1, dtype=_np.int64)
+
+    # For a given scale and x, the loss is convex in y: the ratio loss is V-shaped around
+    # `y_star` and the empty cell loss grows linearly. So only y_min, floor(y_star) and ceil(y_star) are candidates
+    y_min = -(-N // x)
+    y_star = _np.floor(desired_ratio * w * x / h).astype(_np.int64)
+    candidates = _np.sort(_np.stack([y_min, y_star, y_star + 1], axis=1), axis=1) # (x, 3)
+    y = _np.clip(candidates[None, :, :], y_min[None, :, None], y_max[:, None, None]) # (scale, x, 3)
+
+    # Same losses (and float operations) as the naive triple loop over (scale, x, y)
+    a = scales[:, None, None]
+    X = x[None, :, None]
+    valid = (h * a * y <= H) & (w * a * X <= W) & (X * y >= N) & (y >= 1)
+    ratio_loss = _np.abs((h * y) / (w * X) - desired_ratio) # (1)
+    scale_loss = _np.broadcast_to((1 - a) ** 2, y.shape) # (2)
+    empty_cell_loss = X * y / N - 1 # (3)
+    total = _np.where(valid, ratio_loss + scale_loss + empty_cell_loss, _np.inf)
+
+    # pick parameters with the lowest loss. Ties go to the first (scale, x, y) in loop order, just like `min(dict)`
+    i = _np.unravel_index(_np.argmin(total), total.shape)
+    rl, sl, ecl = float(ratio_loss[i]), float(scale_loss[i]), float(empty_cell_loss[i])
     loss_info = {"ratio":rl, "scale":sl, "empty_cell":ecl, "total":rl+sl+ecl}
-    cols, rows, scaling_factor = min(losses, key=losses.get)
-    return cols, rows, scaling_factor, loss_info
+    return int(y[i]), int(x[i[1]]), float(scales[i[0]]), loss_info
 
 
 def _get_grid_image(images:list, cols:int, rows:int, resize_factor:float=1.0):
@@ -233,13 +285,73 @@ def _get_grid_image(images:list, cols:int, rows:int, resize_factor:float=1.0):
     return canvas
 
 
-def _get_image(source, resize_factor: float = 1.0, BGR2RGB: bool = None, image_border:int = None):
+def _value_range(source) -> tuple:
+    """
+    Smallest and largest value in `source` (np.ndarray or torch.Tensor). NaNs propagate.
+    NOTE: This function is only intended to be used by `_get_image()`
+    """
+    if isinstance(source, _torch.Tensor):
+        low, high = _torch.aminmax(source)
+        return low.item(), high.item()
+    return source.min().item(), source.max().item()
+
+
+def _get_ndarray_image(image:_np.ndarray, resize_factor:float, BGR2RGB:bool, image_border:int, max_size:int,
+                       is_copy:bool, bgr2rgb_auto:bool) -> _np.ndarray:
+    """
+    The numpy equivalent of what `_get_image()` does to Pillow images, without the round trip through Pillow.
+    Operations are done in-place whenever `image` is a copy (`is_copy`) and the result may share memory with `image`
+    otherwise, in which case it's returned as read-only.
+    NOTE: This function is only intended to be used by `_get_image()`
+    """
+    from . import images as _images # Imported here, because `images` imports `jupyter_ipython`
+
+    # Shrink before anything else is done to the image. INTER_NEAREST_EXACT is bit exact with Pillow's NEAREST
+    height, width = image.shape[:2]
+    if max_size is not None:
+        size, interpolation = _images._thumbnail_size((width, height), resize_factor, max_size), _cv2.INTER_AREA
+    else:
+        size, interpolation = (int(width * resize_factor), int(height * resize_factor)), _cv2.INTER_NEAREST_EXACT
+    if size != (width, height):
+        image, is_copy = _cv2.resize(_np.ascontiguousarray(image), size, interpolation=interpolation), True
+
+    # Swap blue and red color channel (cv2 stuff)
+    num_channels = 1 if (image.ndim == 2) else image.shape[-1]
+    if BGR2RGB or ((BGR2RGB is None) and bgr2rgb_auto and (num_channels in [3, 4])):
+        # BGR --> RGB or BGRA --> RGBA
+        code = _cv2.COLOR_BGR2RGB if (num_channels == 3) else _cv2.COLOR_BGRA2RGBA
+        contiguous = _np.ascontiguousarray(image)
+        is_copy = is_copy or (contiguous is not image)
+        image, is_copy = _cv2.cvtColor(contiguous, code, dst=contiguous if is_copy else None), True
+
+    # Add border
+    if image_border is not None:
+        image, is_copy = _cv2.copyMakeBorder(image, 1, 1, 1, 1, _cv2.BORDER_CONSTANT, value=[image_border]*3), True
+
+    # Adds 3 identical channels to greyscale images (for compatibility)
+    if image.ndim == 2:
+        image, is_copy = _cv2.cvtColor(image, _cv2.COLOR_GRAY2RGB), True
+
+    # Remove alpha channel (for compatibility)
+    if image.shape[-1] == 4:
+        image = image[:,:,:3]
+
+    if not is_copy:
+        image = image.view()
+        image.flags.writeable = False
+    return image
+
+
+def _get_image(source, resize_factor: float = 1.0, BGR2RGB: bool = None, image_border:int = None, max_size:int = None):
     """
     Take an image in format: path, url, np.ndarray, PIL.Image.Image or torch.tensor.
-    Returns `source` as np.ndarray image after some processing e.g. remove alpha
+    Returns `source` as np.ndarray image after some processing e.g. remove alpha.
+    If `max_size` is not None, the image is shrunk to at most `max_size` pixels along its longest side
+    as early as possible i.e. paths and urls pointing to JPEGs are decoded directly at reduced size
 
     NOTE: This function is only intended to be used by `show_image()`
     """
+    from . import images as _images # Imported here, because `images` imports `jupyter_ipython`
 
     # `source` and `resize` checks
     is_path = _input_output.path_exists(source) if isinstance(source, str) else False
@@ -266,41 +378,65 @@ def _get_image(source, resize_factor: float = 1.0, BGR2RGB: bool = None, image_b
         raise ValueError(f"Expect tensor image to be of shape (channels, height, width), but received: {source.shape}. "
                          f"If your image is of shape (height, width, channels) use `<YOUR_IMAGE>.permute(2, 0, 1)`")
 
-    # Remap from various data types to uint8 if possible
+    # Remap from various data types to uint8 if possible. The value range is found with 1 reduction per bound (or
+    # a single `aminmax` for tensors) rather than with several full size boolean masks
     if (is_torch_tensor or is_ndarray) and (_re.search("uint8", str(source.dtype)) is None):
         is_float = (_re.search("float", str(source.dtype)) is not None)
         is_int = (_re.search("int", str(source.dtype)) is not None)
         map_to_uint8 = lambda s: s.astype(_np.uint8) if is_ndarray else s.to(torch.uint8)
+        low, high = _value_range(source) if (is_float or is_int) else (None, None)
+        is_in_range = lambda maximum: (low is not None) and (0.0 <= low) and (high <= maximum) # False if NaN
 
         # If all pixel values are in range 0-255 --> remap to range 0-255 and cast to unit8
-        if (is_float or is_int) and (0.0 <= source ).all() and (source <= 1.0 ).all():
+        if is_in_range(1.0):
             source = map_to_uint8(source*255)
 
         # If any pixel value exceed 1 and all pixels are in range 0-255 --> cast to unit8 directly
-        elif (is_float or is_int) and (source > 1.0).any() and (0.0 <= source).all() and (source <= 255.0).all():
+        elif is_in_range(255.0) and (high > 1.0):
             source = map_to_uint8(source)
 
         else:
             suggestion = "<YOUR_IMAGE>.to(torch.uint8)" if is_torch_tensor else "<YOUR_IMAGE>.astype(np.uint8)"
             raise ValueError(f"Expected type `uint8`, but received dtype `{source.dtype}`."
                              f" Try changing the image type with `{suggestion}`")
+        is_copy = True
+    else:
+        is_copy = False
+
+    # ndarrays and tensors are processed in numpy directly, unless their shape is one Pillow would have refused
+    if is_torch_tensor:
+        source = source.detach().cpu()
+        source = (source.permute(1, 2, 0) if (len(source.shape) > 2) else source).numpy()
+    if (is_ndarray or is_torch_tensor) and ((source.ndim == 2) or ((source.ndim == 3) and (source.shape[-1] in [2, 3, 4]))):
+        return _get_ndarray_image(source, resize_factor, BGR2RGB, image_border, max_size, is_copy,
+                                  bgr2rgb_auto=is_ndarray)
 
     # Ensure `source` is a Pillow image
     if is_pillow:
         image = source
     elif is_path:
-        image = _Image.open(source)
+        # Decoded (and resized) through the optional image cache, see `images.enable_image_cache()`
+        loader = lambda: _images._load_pillow_array(source, resize_factor, max_size)
+        resize = resize_factor if (max_size is None) else (resize_factor, max_size)
+        image = _Image.fromarray(_images._cached_image(source, "pillow", resize, loader))
     elif is_url:
-        image = _Image.open(_requests.get(source, stream=True).raw)
-    elif is_ndarray:
-        image = _Image.fromarray(source)
-    elif is_torch_tensor:
-        source = source.detach().cpu()
-        corrected = source.permute(1, 2, 0) if (len(source.shape) > 2) else source
-        image = _Image.fromarray(corrected.numpy())
+        image = _Image.open(_io.BytesIO(_images._fetch_url(source))) # Pooled connection, see `images.get_images_from_urls()`
+        if max_size is not None: # Let the JPEG decoder do most of the downscaling
+            target_size = _images._thumbnail_size(image.size, resize_factor, max_size)
+            image.draft(image.mode, target_size)
+    elif is_ndarray or is_torch_tensor:
+        image = _Image.fromarray(source) # Will raise, the shapes numpy can handle never make it this far
     else:
         raise RuntimeError("Shouldn't have gotten this far")
 
+    # Shrink before anything else is done to the image
+    if (max_size is not None) and not is_path:
+        if not is_url: # The size of drafted url images has already changed
+            target_size = _images._thumbnail_size(image.size, resize_factor, max_size)
+        if image.size != target_size:
+            resample = _Image.BOX if image.mode in ["L", "LA", "RGB", "RGBA"] else _Image.NEAREST
+            image = image.resize(target_size, resample=resample)
+
     # Swap blue and red color channel (cv2 stuff)
     num_channels = len(image.getbands())
     bgr2rgb_auto = (BGR2RGB is None) and is_ndarray and (num_channels in [3, 4])
@@ -311,7 +447,7 @@ def _get_image(source, resize_factor: float = 1.0, BGR2RGB: bool = None, image_b
             else _cv2.cvtColor(as_array, _cv2.COLOR_BGRA2RGBA)
         image = _Image.fromarray(color_corrected)
 
-    if resize_factor != 1.0:
+    if (resize_factor != 1.0) and not is_path and (max_size is None):
         width = int(image.size[0] * resize_factor)
         height = int(image.size[1] * resize_factor)
         image = image.resize((width, height), resample=0, box=None)
@@ -333,7 +469,8 @@ def _get_image(source, resize_factor: float = 1.0, BGR2RGB: bool = None, image_b
     return image
 
 
-def show_image(source, resize_factor:float=1.0, BGR2RGB:bool=None, return_image:bool=False, image_border:int=None):
+def show_image(source, resize_factor:float=1.0, BGR2RGB:bool=None, return_image:bool=False, image_border:int=None,
+               thumbnail_size=None, workers:int=8):
     """
     Display a single image or a list of images.
     Accepted image formats: path, np.ndarray, PIL.Image.Image, torch.Tensor and url.
@@ -343,11 +480,17 @@ def show_image(source, resize_factor:float=1.0, BGR2RGB:bool=None, return_image:
     @param BGR2RGB: Convert `source` from BGR to RGB. If `None`, will convert np.ndarray images automatically
     @param return_image: return image as `np.ndarray`
     @param image_border: If not None, add border around each image equal to the value of `image_border` must be in [0,255]
+    @param thumbnail_size: If not None and `source` is a list, every image is decoded/resized directly to at most
+                           `thumbnail_size` pixels along its longest side, which saves a lot of memory and time.
+                           "auto" picks the size at which the images roughly fill the largest displayed image (3840x2160)
+    @param workers: Number of threads used to prepare the images if `source` is a list
     """
 
     # Checks
     _type_check.assert_in(type(source), [_np.ndarray, _torch.Tensor, _PIL.Image.Image, str, list, tuple])
-    _type_check.assert_types([resize_factor, BGR2RGB, image_border], [float, bool, int], [0, 1, 1])
+    _type_check.assert_types([resize_factor, BGR2RGB, image_border, thumbnail_size, workers],
+                             [float, bool, int, (int, str), int], [0, 1, 1, 1, 0])
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
     if not _ALLOW_NONE_JUPYTER: assert_in_jupyter()
     if isinstance(source, (list, tuple)) and (not len(source)):
         raise ValueError("The that should contain image-information `source` is empty. Did you perhaps pass an empty list or something similar?")
@@ -355,6 +498,10 @@ def show_image(source, resize_factor:float=1.0, BGR2RGB:bool=None, return_image:
     if (image_border is not None) and not (0 <= image_border <= 255):
         raise ValueError("`image_border` is a pixel value and must therefore be between [0,255], "
                          f"but received `{image_border}`")
+    if isinstance(thumbnail_size, str):
+        _type_check.assert_in(thumbnail_size, ["auto"])
+    elif thumbnail_size is not None:
+        _type_check.assert_comparison_number(thumbnail_size, 1, ">=", "thumbnail_size")
 
 
     # Prepare the final image(s)
@@ -369,7 +516,12 @@ def show_image(source, resize_factor:float=1.0, BGR2RGB:bool=None, return_image:
             random_indexes_200 = _np.random.choice(_np.arange(len(source)), 200, replace=False)
             source = [source[i] for i in random_indexes_200]
 
-        images = [_get_image(image, resize_factor, BGR2RGB, image_border) for image in source]
+        # Prepare the images in parallel, decoded straight to thumbnail size if `thumbnail_size` is specified
+        if thumbnail_size == "auto":
+            thumbnail_size = max(32, int((3840 * 2160 / len(source)) ** 0.5))
+        get_image = lambda image: _get_image(image, resize_factor, BGR2RGB, image_border, thumbnail_size)
+        with _ThreadPoolExecutor(max_workers=workers) as executor:
+            images = list(executor.map(get_image, source))
         final_image = _get_collage_image(images, allow_rotations=False)
 
 
@@ -4,6 +4,7 @@ Make it more convenient to work with time and dates
 """
 
 import time as _time
+from collections import deque as _deque
 from datetime import timedelta as _timedelta
 from . import type_check as _type_check
 
@@ -109,6 +110,7 @@ class StopWatch:
 class FPSTimer:
     """
     Keep track of frames per second.
+    Only the last 2 ticks are kept (`get_fps()` doesn't need more), so memory use is constant in long running loops.
 
     Example:
     >> fps_timer = FPSTimer()
@@ -135,7 +137,8 @@ class FPSTimer:
 
         self._start_time = None
         self._elapsed_time = None
-        self.ticks = []
+        self.ticks = _deque(maxlen=2)
+        self._frame_count = 0
         self.precision_decimals = precision_decimals
 
 
@@ -151,17 +154,18 @@ class FPSTimer:
         if self._start_time is None:
             raise RuntimeError("Call `start()` before you call `increment()`")
         self.ticks.append( _time.time() - self._start_time )
+        self._frame_count += 1
 
 
     def get_frame_count(self):
-        return len(self.ticks)
+        return self._frame_count
 
 
     def get_fps(self):
         if self._start_time is None:
             raise RuntimeError("Call `start()` before you call `get_fps()`")
 
-        if len(self.ticks) < 2:
+        if (len(self.ticks) < 2) or (self.ticks[-1] == self.ticks[-2]): # Equal if ticked within the clock resolution
             fps = 0
         else:
             fps = 1 / (self.ticks[-1] - self.ticks[-2])
@@ -170,7 +174,8 @@ class FPSTimer:
 
     def reset(self):
         self._elapsed_time = None
-        self.ticks = []
+        self.ticks.clear()
+        self._frame_count = 0
 
 
 month_names = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
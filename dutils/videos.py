@@ -1,4 +1,5 @@
 import cv2 as _cv2
+import numpy as _np
 import re as _re
 import time as _time
 import os as _os
@@ -8,18 +9,99 @@ from . import type_check as _type_check
 from . import input_output as _io
 from . import images as _images
 import subprocess as _subprocess
-import platform as _platform
 import random as _random
+import json as _json
+import math as _math
+import shutil as _shutil
+import tempfile as _tempfile
+import queue as _queue
+import threading as _threading
+import multiprocessing as _multiprocessing
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from concurrent.futures import as_completed as _as_completed
 
 if _in_jupyter():
     from tqdm.notebook import tqdm as _tqdm
 else:
     from tqdm import tqdm as _tqdm
 
+# Default number of threads used to process frames in `run_frame_pipeline()`
+_DEFAULT_WORKERS = min(8, _os.cpu_count() or 1)
+_PIPELINE_DONE = object() # Put on the queue when the producer has no more items
+
+# Gaps between requested frames larger than this are seeked, smaller gaps are grabbed one frame at a time
+_SEEK_MIN_GAP = 64
+
+
+def _ffprobe(path:str):
+    """
+    Run ffprobe once on `path` and return its parsed json output (streams and format).
+    Return None if ffprobe isn't installed.
+    """
+    cmd = ["ffprobe", "-v", "error", "-print_format", "json", "-show_streams", "-show_format", path]
+    try:
+        process = _subprocess.run(cmd, stdout=_subprocess.PIPE, stderr=_subprocess.PIPE)
+    except FileNotFoundError:
+        return None
+
+    if process.returncode != 0:
+        raise RuntimeError(f"ffprobe failed on `{path}` with: {process.stderr.decode('UTF-8', 'ignore').strip()}")
+    return _json.loads(process.stdout.decode("UTF-8", "ignore"))
+
+
+def _parse_frame_rate(frame_rate:str) -> float:
+    """ Convert ffprobe's frame rate format e.g. "30000/1001" to float. Return 0.0 if unknown """
+    numerator, _, denominator = str(frame_rate).partition("/")
+    try:
+        return float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _video_info_from_path(path:str) -> dict:
+    """ Used by `get_video_info()` and `get_videos_info()`. Probe `path` with ffprobe (or cv2 as a fallback) """
+    info = dict(
+        video_format = _io.get_file_extension(path).replace(".", ""),
+        size = _io.get_file_size(path),
+    )
+    probe = _ffprobe(path)
+
+    # cv2 fallback if ffprobe is not installed. NOTE: cv2 has no way of getting the bit rate or codec name
+    if probe is None:
+        cap = _cv2.VideoCapture(path)
+        info["height"] = int(cap.get(_cv2.CAP_PROP_FRAME_HEIGHT))
+        info["width"] = int(cap.get(_cv2.CAP_PROP_FRAME_WIDTH))
+        info["frame_count"] = int(cap.get(_cv2.CAP_PROP_FRAME_COUNT))
+        info["fps"] = int(cap.get(_cv2.CAP_PROP_FPS))
+        cap.release()
+    else:
+        video_streams = [stream for stream in probe.get("streams", []) if stream.get("codec_type") == "video"]
+        if not video_streams:
+            raise ValueError(f"Failed to find a video stream in `{path}`")
+        stream = video_streams[0]
+
+        fps = _parse_frame_rate(stream.get("avg_frame_rate")) or _parse_frame_rate(stream.get("r_frame_rate"))
+        duration = float(stream.get("duration") or probe.get("format", {}).get("duration") or 0)
+        info["height"] = int(stream.get("height", 0))
+        info["width"] = int(stream.get("width", 0))
+        info["frame_count"] = int(stream["nb_frames"]) if "nb_frames" in stream else int(round(duration * fps))
+        info["fps"] = int(fps)
+        if "bit_rate" in stream:
+            info["bit_rate"] = stream["bit_rate"]
+        if "codec_long_name" in stream:
+            info["codec_long_name"] = stream["codec_long_name"]
+
+    info["duration_sec"] = round(info["frame_count"] / info["fps"], 2) if info["fps"] else 0.0
+    info["duration_hms"] = _re.sub(r"00[hms] |0(?=[1-9])", "", _time.strftime("%Hh %Mm %Ss", _time.gmtime(info["duration_sec"])))
+    return info
+
 
 def get_video_info(path:str) -> dict:
     """
     Return general information (FPS, dimensions, etc.) about the video at `path`
+    NOTE: Uses ffprobe if it's installed, otherwise cv2 (which cannot provide `bit_rate` and `codec_long_name`)
+
     @param path:
     @return: dict with video info
     """
@@ -28,41 +110,340 @@ def get_video_info(path:str) -> dict:
     if not _io.is_file(path):
         raise ValueError("`path` must point to a file")
 
-    # Info from cv2 # TODO Transfer this to FFMPEG instead of using cv2
-    cap = _cv2.VideoCapture(path)
-    info = dict(
-        video_format = _io.get_file_extension(path).replace(".", ""),
-        size = _io.get_file_size(path),
-        height = int(cap.get(_cv2.CAP_PROP_FRAME_HEIGHT)),
-        width = int(cap.get(_cv2.CAP_PROP_FRAME_WIDTH)),
-        frame_count = int(cap.get(_cv2.CAP_PROP_FRAME_COUNT)),
-        fps = int(cap.get(_cv2.CAP_PROP_FPS)),
-    )
-    info["duration_sec"] = round(info["frame_count"] / info["fps"], 2)
-    info["duration_hms"] = _re.sub(r"00[hms] |0(?=[1-9])", "", _time.strftime("%Hh %Mm %Ss", _time.gmtime(info["duration_sec"])))
+    return _video_info_from_path(path)
 
-    # Info from FFMPEG (Could not find a way to get it from cv2)
-    if _platform.system() == 'Windows': cmd = ["ffprobe", "-show_streams", path]
-    else: cmd = ["ffprobe -show_streams " + path]
-    p = _subprocess.Popen(cmd, stdout=_subprocess.PIPE, stderr=_subprocess.PIPE, shell=True)
-    lines = [str(line.decode('UTF-8', 'ignore')) for line in iter(p.stdout.readline, b'')]
 
-    for line in lines:
-        if line.startswith("bit_rate="):
-            info["bit_rate"] = line[len("bit_rate="):].strip()
-        if line.startswith("codec_long_name="):
-            info["codec_long_name"] = line[len("codec_long_name="):].strip()
+def get_videos_info(paths:list, workers:int=8, cache_path:str=None) -> list:
+    """
+    Bulk version of `get_video_info()`. The videos are probed concurrently by `workers` threads.
+    If `cache_path` is given, the results are stored in a .json file keyed by (path, size, modification time),
+    such that repeated calls only probe new or changed files.
 
-    return info
+    EXAMPLE:
+    >> infos = get_videos_info(glob("./videos/*.mp4"), workers=16, cache_path="./video_info_cache.json")
+    >> infos[0]["fps"]
+    30
+
+    @param paths: paths pointing to video files
+    @param workers: Number of videos probed at the same time
+    @param cache_path: Path to a .json file used as cache. It's created if it doesn't exists
+    @return: list of dicts with video info, in the same order as `paths`
+    """
+    # Checks
+    _type_check.assert_types([paths, workers, cache_path], [list, int, str], [0, 0, 1])
+    _type_check.assert_list_slow(paths, str)
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+    for path in paths:
+        if not _io.is_file(path):
+            raise ValueError(f"Expected every path to point to a file, but received `{path}`")
+    if (cache_path is not None) and (_io.get_file_extension(cache_path) != ".json"):
+        raise ValueError("Expected `cache_path` to have a .json file extension, but received something else")
+
+    # Load cache
+    cache = {}
+    if (cache_path is not None) and _io.is_file(cache_path):
+        cache = _io.read_json(cache_path)
+
+    def cache_key(path):
+        stat = _os.stat(path)
+        return _os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    # Only probe the files that are not in the cache or have changed since
+    keys = {path: cache_key(path) for path in paths}
+    to_probe = [path for path in set(paths) if list(keys[path][1:]) != cache.get(keys[path][0], {}).get("key")]
+
+    # A failing probe (e.g. a corrupt file) must not throw away the ones that succeeded, so errors are raised last
+    errors = []
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+        future_to_path = {executor.submit(_video_info_from_path, path): path for path in to_probe}
+        for future in _tqdm(_as_completed(future_to_path), total=len(future_to_path), disable=len(to_probe) < 2):
+            path = future_to_path[future]
+            abs_path, size, mtime = keys[path]
+            try:
+                cache[abs_path] = {"key": [size, mtime], "info": future.result()}
+            except Exception as e:
+                errors.append((path, e))
+
+    # Save cache. Written to a temporary file first, so an interruption cannot corrupt the old cache
+    if (cache_path is not None) and (len(errors) < len(to_probe)):
+        with open(cache_path + ".tmp", "w") as f:
+            _json.dump(cache, f)
+        _os.replace(cache_path + ".tmp", cache_path)
+
+    if errors:
+        path, error = errors[0]
+        cached = "" if (cache_path is None) else " Every successful probe has been cached."
+        raise RuntimeError(f"Failed to get the video info of `{path}` "
+                           f"({len(errors)} of {len(to_probe)} probes failed).{cached}") from error
+
+    return [dict(cache[keys[path][0]]["info"]) for path in paths]
+
+
+def _put_unless_stopped(q: _queue.Queue, item, stop: _threading.Event) -> bool:
+    """ Put `item` on `q`, but give up if `stop` is set while waiting for a free slot. Return True if `item` was put """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except _queue.Full:
+            pass
+    return False
+
+
+def run_frame_pipeline(producer, process: _type_check.FunctionType, consumer: _type_check.FunctionType,
+                       workers: int = 1, queue_size: int = 32) -> int:
+    """
+    Run a three stage producer/consumer pipeline:
+        (1) `producer` is iterated in a separate thread e.g. decoding frames with cv2
+        (2) `process` is applied to every item in a separate thread, or a pool of `workers` threads e.g. resizing
+        (3) `consumer` is called with every processed item in the calling thread e.g. encoding and writing frames
+
+    The stages are connected by a bounded queue, so memory use is limited to roughly `queue_size` items no matter
+    how many items `producer` yields. The items are passed to `consumer` in the same order as they were produced.
+    NOTE1: cv2 releases the GIL while decoding, encoding and doing most of its image processing, which is
+           why threads are enough for the stages to run in parallel.
+    NOTE2: With the default `workers=1`, `process` is called one item at a time, in order, so it may be stateful.
+           `workers` > 1 is opt-in and requires `process` to be thread safe.
+
+    EXAMPLE:
+    >> frames = (cv2.imread(path) for path in paths)
+    >> run_frame_pipeline(frames, lambda frame: cv2.resize(frame, (640, 480)), video_writer.write, workers=4)
+
+    @param producer: An iterable (e.g. a generator) that yields the items for processing
+    @param process: Function applied to each item. Is called from multiple threads at the same time if `workers` > 1
+    @param consumer: Function called with each processed item, in order
+    @param workers: Number of threads used for `process`, see NOTE2
+    @param queue_size: Maximum number of items which are produced, but not yet consumed
+    @return: Number of items passed to `consumer`
+    """
+    # Checks
+    _type_check.assert_types([workers, queue_size], [int, int])
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+    _type_check.assert_comparison_number(queue_size, 1, ">=", "queue_size")
+    if not (callable(process) and callable(consumer)):
+        raise TypeError("Expected `process` and `consumer` to be callable")
+
+    futures = _queue.Queue(maxsize=queue_size)
+    stop = _threading.Event()
+    producer_errors = []
+
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def produce():
+            try:
+                for item in producer:
+                    if not _put_unless_stopped(futures, executor.submit(process, item), stop):
+                        return
+            except BaseException as e:
+                producer_errors.append(e)
+            finally:
+                _put_unless_stopped(futures, _PIPELINE_DONE, stop)
+
+        producer_thread = _threading.Thread(target=produce, daemon=True)
+        producer_thread.start()
+
+        # Consume in order. If anything fails, the producer is stopped and the remaining work is cancelled
+        consumed = 0
+        try:
+            while True:
+                future = futures.get()
+                if future is _PIPELINE_DONE:
+                    break
+                consumer(future.result())
+                consumed += 1
+        finally:
+            stop.set()
+            producer_thread.join()
+            while not futures.empty():
+                future = futures.get_nowait()
+                if future is not _PIPELINE_DONE:
+                    future.cancel()
+
+    if producer_errors:
+        raise producer_errors[0]
+    return consumed
+
+
+def _preprocess_frame(frame, scale_factor: float, rotate_angle: int, extra_apply: _type_check.FunctionType = None):
+    """ Resize, rotate and apply `extra_apply` to a single frame. NOTE: Only intended to be used by `preprocess_video()` """
+    resized = _images.ndarray_resize_image(frame, scale_factor)
+    rotated = _images.rotate_image(resized, rotate_angle)
+    return rotated if extra_apply is None else extra_apply(rotated)
+
+
+def _seek_to_frame(cap: _cv2.VideoCapture, frame_index: int) -> bool:
+    """
+    Move `cap` to `frame_index` such that the next `cap.read()` returns frame number `frame_index`.
+    The position is verified after every seek, since some videos can only be seeked accurately to keyframes:
+        (1) Seek directly to `frame_index`
+        (2) Seek to an earlier frame (hopefully before the closest keyframe) and grab forward to `frame_index`.
+            The distance is doubled until it works.
+        (3) Grab every frame from the start of the video
+
+    @return: False if the video ended before `frame_index` was reached, otherwise True
+    """
+    cap.set(_cv2.CAP_PROP_POS_FRAMES, frame_index)
+    if int(cap.get(_cv2.CAP_PROP_POS_FRAMES)) == frame_index:
+        return True
+
+    back_off = 16
+    while frame_index - back_off > 0:
+        cap.set(_cv2.CAP_PROP_POS_FRAMES, frame_index - back_off)
+        position = int(cap.get(_cv2.CAP_PROP_POS_FRAMES))
+        if 0 <= position <= frame_index:
+            for _ in range(frame_index - position):
+                if not cap.grab():
+                    return False
+            if int(cap.get(_cv2.CAP_PROP_POS_FRAMES)) == frame_index:
+                return True
+        back_off *= 2
+
+    cap.set(_cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(frame_index):
+        if not cap.grab():
+            return False
+    return True
+
+
+def _read_frames(cap: _cv2.VideoCapture, start: int = 0, end: int = None, every_nth_frame: int = 1, progress_bar=None):
+    """
+    Yield `(frame_index, frame)` for every `every_nth_frame` frame in range [`start`, `end`) of `cap`, counted from `start`.
+    Frames which are skipped are only grabbed, which skip the (expensive) decoding.
+    If `end` is None, frames are yielded until the video ends.
+    """
+    if start:
+        _seek_to_frame(cap, start)
+
+    frame_i = start - 1
+    while cap.isOpened() and ((end is None) or (frame_i + 1 < end)):
+        if progress_bar is not None:
+            progress_bar.update(1)
+        frame_i += 1
+
+        if (frame_i - start) % every_nth_frame != 0:
+            if not cap.grab():
+                break
+            continue
+
+        video_feed_active, frame = cap.read()
+        if not video_feed_active:
+            break
+        yield frame_i, frame
+
+
+def _preprocess_video_segment(load_path: str, save_path: str, start: int, end: int, save_every_nth_frame: int,
+                              scale_factor: float, rotate_angle: int, fps_out: int,
+                              extra_apply: _type_check.FunctionType = None, fourcc: int = 0, progress_bar=None) -> int:
+    """
+    Process the frames in range [`start`, `end`) of `load_path` and write them to `save_path`.
+    If `end` is None, the frames are processed until the video ends.
+    NOTE: Only intended to be used by `preprocess_video()` and `preprocess_videos()`
+
+    @return: The number of frames written to `save_path`
+    """
+    cap = _cv2.VideoCapture(load_path)
+    video = None # The writer is opened after the first frame, cause the final size depends on e.g. `extra_apply`
+
+    def write(frame):
+        nonlocal video
+        if video is None:
+            height, width = frame.shape[:2]
+            video = _cv2.VideoWriter(save_path, fourcc, fps_out, (width, height))
+        video.write(frame)
+
+    # Decode, process and write frames in parallel. Only a few frames are kept in memory at any given time.
+    # Processing is kept in a single thread: `extra_apply` may be stateful and `preprocess_video(workers > 1)`
+    # already runs a segment per process, so a thread pool on top would only oversubscribe the CPU
+    try:
+        frames = (frame for _, frame in _read_frames(cap, start, end, save_every_nth_frame, progress_bar))
+        process = lambda frame: _preprocess_frame(frame, scale_factor, rotate_angle, extra_apply)
+        frames_written = run_frame_pipeline(frames, process, write, workers=1)
+    finally:
+        cap.release()
+        if video is not None:
+            video.release()
+
+    return frames_written
+
+
+def _process_pool(workers: int) -> _ProcessPoolExecutor:
+    """
+    Return a pool of `workers` processes started with "spawn" on every platform.
+    Forking a process that runs other threads (tqdm's monitor, cv2's thread pool, `run_frame_pipeline()` etc.)
+    can leave the child waiting forever on a lock which was held by one of those threads at the time of the fork.
+    NOTE: Only intended to be used by `preprocess_video()` and `preprocess_videos()`
+    """
+    return _ProcessPoolExecutor(max_workers=workers, mp_context=_multiprocessing.get_context("spawn"))
+
+
+def _preprocess_video_parallel(load_path: str, save_path: str, num_frames: int, workers: int, save_every_nth_frame: int,
+                               scale_factor: float, rotate_angle: int, fps_out: int,
+                               extra_apply: _type_check.FunctionType = None) -> int:
+    """
+    Split `load_path` into `workers` segments, process them in separate processes and stitch them together in order.
+    NOTE: Only intended to be used by `preprocess_video()`
+
+    @return: The number of frames written to `save_path`
+    """
+
+    # Segments start at a multiple of `save_every_nth_frame`, so the exact same frames are kept as when `workers=1`
+    frames_per_segment = max(1, _math.ceil(num_frames / workers / save_every_nth_frame)) * save_every_nth_frame
+    starts = list(range(0, max(num_frames, 1), frames_per_segment))
+    ends = starts[1:] + [None] # The last segment runs until the end, in case `CAP_PROP_FRAME_COUNT` is off
+
+    temp_folder = _tempfile.mkdtemp()
+    segment_paths = [_os.path.join(temp_folder, f"segment_{i}.avi") for i in range(len(starts))]
+    lossless = _cv2.VideoWriter_fourcc(*"FFV1") # Avoid any additional compression loss in the segments
+    frames_written = 0
+
+    try:
+        # Process segments
+        with _process_pool(workers) as executor:
+            futures = [
+                executor.submit(_preprocess_video_segment, load_path, segment_path, start, end, save_every_nth_frame,
+                                scale_factor, rotate_angle, fps_out, extra_apply, lossless)
+                for (segment_path, start, end) in zip(segment_paths, starts, ends)
+            ]
+            for future in _tqdm(_as_completed(futures), total=len(futures), desc="Segments"):
+                future.result()
+
+        # Stitch segments together in order
+        video = None
+        for segment_path in segment_paths:
+            cap = _cv2.VideoCapture(segment_path)
+            while cap.isOpened():
+                video_feed_active, frame = cap.read()
+                if not video_feed_active:
+                    break
+                if video is None:
+                    height, width = frame.shape[:2]
+                    video = _cv2.VideoWriter(save_path, 0, fps_out, (width, height))
+                video.write(frame)
+                frames_written += 1
+            cap.release()
+
+        if video is not None:
+            video.release()
+    finally:
+        _shutil.rmtree(temp_folder, ignore_errors=True)
+
+    return frames_written
 
 
 def preprocess_video(load_path: str, save_path: str, save_every_nth_frame: int = 3, scale_factor: float = 0.5,
-                     rotate_angle: int = 0, fps_out: int = 10, extra_apply: _type_check.FunctionType = None) -> None:
+                     rotate_angle: int = 0, fps_out: int = 10, extra_apply: _type_check.FunctionType = None,
+                     workers: int = 1) -> None:
     """
     Load video located at `load_path` for processing: Reduce FPS by `save_every_nth_frame`,
     resize resolution by `scale_factor` and clockwise rotation by `rotate_angle` .
     The modified video is saved at `save_path` with a FPS of `fps_out`
-    NOTE: The frames used to reconstruct the video is kept in memory during processing, which may be problematic for larger videos
+    NOTE1: Frames are written to `save_path` as soon as they are processed, so memory use is independent of video length.
+           Skipped frames are never decoded, which makes large values of `save_every_nth_frame` a lot faster.
+    NOTE2: If `workers` > 1, the video is split into segments which are processed in separate processes.
+           The processes are spawned (not forked) on every platform, so `extra_apply` must be picklable
+           (i.e. defined at module level, not a lambda) and scripts must guard the call by `if __name__ == "__main__":`
+    NOTE3: Decoding, processing and writing overlap in separate threads (see `run_frame_pipeline()`), but
+           `extra_apply` is only ever called from one thread per process, one frame at a time and in order.
 
     EXAMPLE:
     >> preprocess_video("video_in.avi", "video_out.mp4", 10, 0.35, -90, 10)
@@ -74,107 +455,251 @@ def preprocess_video(load_path: str, save_path: str, save_every_nth_frame: int =
     @param rotate_angle: Clockwise rotation of the image. must be within [0, 90, -90, 180, -180, -270, 270]
     @param fps_out: The frame rate of the processed video which is saved at `save_path`
     @param extra_apply: and extra function which can be applied to the image at the very end e.g. for cropping, noise etc.
+    @param workers: Number of processes used. If 1, everything is done in the current process
     @return: None
     """
 
     # Checks
     _type_check.assert_types(
-        to_check=[load_path, save_path, save_every_nth_frame, scale_factor, rotate_angle, fps_out],
-        expected_types=[str, str, int, float, int, int]
+        to_check=[load_path, save_path, save_every_nth_frame, scale_factor, rotate_angle, fps_out, workers],
+        expected_types=[str, str, int, float, int, int, int]
     )
     _io.path_exists(load_path)
     legal_formats = [".mp4", ".avi"]
     _type_check.assert_in(_io.get_file_extension(load_path).lower(), legal_formats)
     _type_check.assert_in(_io.get_file_extension(save_path).lower(), legal_formats)
+    _type_check.assert_comparison_number(save_every_nth_frame, 1, ">=", "save_every_nth_frame")
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
 
     # Setup
-    temp_images = []
     cap = _cv2.VideoCapture(load_path)
-    frame_i = -1
     num_frames = int(cap.get(_cv2.CAP_PROP_FRAME_COUNT))
-    progress_bar = _tqdm(total=num_frames)
+    cap.release()
 
-    # Prepare all frames for modified video
-    while cap.isOpened():
-        progress_bar.update(1)
-        frame_i += 1
-        video_feed_active, frame = cap.read()
+    # Process
+    if workers == 1:
+        progress_bar = _tqdm(total=num_frames)
+        frames_written = _preprocess_video_segment(load_path, save_path, 0, None, save_every_nth_frame, scale_factor,
+                                                   rotate_angle, fps_out, extra_apply, progress_bar=progress_bar)
+        progress_bar.close()
+    else:
+        frames_written = _preprocess_video_parallel(load_path, save_path, num_frames, workers, save_every_nth_frame,
+                                                    scale_factor, rotate_angle, fps_out, extra_apply)
 
-        if not video_feed_active:
-            cap.release()
-            _cv2.destroyAllWindows()
-            break
-
-        if frame_i % save_every_nth_frame != 0:  # Only process every n'th frame.
-            continue
+    if not frames_written:
+        raise RuntimeError(f"Failed to read any frames from `{load_path}`")
 
-        resized = _images.ndarray_resize_image(frame, scale_factor)
-        rotated = _images.rotate_image(resized, rotate_angle)
-        final = rotated if extra_apply is None else extra_apply(rotated)
-        temp_images.append(final)
-    progress_bar.close()
 
-    # Combine processed frames to video
-    height, width, _ = temp_images[0].shape
-    video = _cv2.VideoWriter(save_path, 0, fps_out, (width, height))
+def preprocess_videos(load_paths: list, save_paths: list, workers: int = 1, save_every_nth_frame: int = 3,
+                      scale_factor: float = 0.5, rotate_angle: int = 0, fps_out: int = 10,
+                      extra_apply: _type_check.FunctionType = None) -> None:
+    """
+    Batch version of `preprocess_video()`. Each video is processed as a whole in one of `workers` processes,
+    which is a lot faster than calling `preprocess_video()` on thousands of clips one at a time.
+    NOTE: When `workers` > 1, `extra_apply` must be picklable and the call guarded by `if __name__ == "__main__":`,
+          see NOTE2 in `preprocess_video()`
 
-    for image in temp_images:
-        video.write(image)
+    EXAMPLE:
+    >> preprocess_videos(["a.avi", "b.avi"], ["a_out.avi", "b_out.avi"], workers=8, save_every_nth_frame=10)
+
+    @param load_paths: Load paths of the videos for processing. Must be ".mp4" or ".avi"
+    @param save_paths: Save paths of the processed videos, one for each path in `load_paths`. Must be ".mp4" or ".avi"
+    @param workers: Number of processes used. If 1, everything is done in the current process
+    @param save_every_nth_frame: See `preprocess_video()`
+    @param scale_factor: See `preprocess_video()`
+    @param rotate_angle: See `preprocess_video()`
+    @param fps_out: See `preprocess_video()`
+    @param extra_apply: See `preprocess_video()`
+    @return: None
+    """
 
-    _cv2.destroyAllWindows()
-    video.release()
+    # Checks
+    _type_check.assert_types(
+        to_check=[load_paths, save_paths, workers, save_every_nth_frame, scale_factor, rotate_angle, fps_out],
+        expected_types=[list, list, int, int, float, int, int]
+    )
+    if len(load_paths) != len(save_paths):
+        raise ValueError(f"Expected `load_paths` and `save_paths` to have the same length, "
+                         f"but received `{len(load_paths)}` and `{len(save_paths)}`")
+    legal_formats = [".mp4", ".avi"]
+    for load_path, save_path in zip(load_paths, save_paths):
+        _io.assert_path(load_path)
+        _type_check.assert_in(_io.get_file_extension(load_path).lower(), legal_formats)
+        _type_check.assert_in(_io.get_file_extension(save_path).lower(), legal_formats)
+    _type_check.assert_comparison_number(save_every_nth_frame, 1, ">=", "save_every_nth_frame")
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+
+    arguments = [(load_path, save_path, 0, None, save_every_nth_frame, scale_factor, rotate_angle, fps_out, extra_apply)
+                 for (load_path, save_path) in zip(load_paths, save_paths)]
+    progress_bar = _tqdm(total=len(load_paths), desc="Videos")
+
+    # Single process
+    if workers == 1:
+        for args in arguments:
+            progress_bar.set_postfix_str(_os.path.basename(args[0]))
+            if not _preprocess_video_segment(*args):
+                raise RuntimeError(f"Failed to read any frames from `{args[0]}`")
+            progress_bar.update(1)
+        progress_bar.close()
+        return
+
+    # Multiple processes. The videos are reported as they finish, which is not necessarily in order.
+    with _process_pool(workers) as executor:
+        future_to_path = {executor.submit(_preprocess_video_segment, *args): args[0] for args in arguments}
+        for future in _as_completed(future_to_path):
+            load_path = future_to_path[future]
+            if not future.result():
+                raise RuntimeError(f"Failed to read any frames from `{load_path}`")
+            progress_bar.set_postfix_str(_os.path.basename(load_path))
+            progress_bar.update(1)
+    progress_bar.close()
 
 
-def video_to_images(video_path:str, image_folder_path:str) -> None:
+def video_to_images(video_path:str, image_folder_path:str, image_format:str=".png", png_compression:int=None,
+                    jpg_quality:int=95, save_every_nth_frame:int=1, start_sec:float=None, end_sec:float=None,
+                    workers:int=_DEFAULT_WORKERS) -> None:
     """
-    Break a video down into individual frames and save them to disk.
+    Break a video down into individual frames and save them to disk. The frames are named after their frame index
+    e.g. "./frames_folder/42.png". Encoding and saving is done by `workers` threads, which is by far the slowest part.
 
     EXAMPLE:
     >> video_to_images("./video_in.MP4", "./frames_folder")
+    >> video_to_images("./video_in.MP4", "./frames_folder", ".jpg", jpg_quality=90, save_every_nth_frame=5, start_sec=60)
 
     @param video_path: video load path for processing. Must be ".mp4" or ".avi"
     @param image_folder_path: Path to folder where the frames are to be saved
+    @param image_format: Must be in [".png", ".jpg", ".npy"]. ".npy" saves the raw frame, which skips encoding entirely
+    @param png_compression: PNG compression level 0-9. Lower is faster, but gives larger files. None -> cv2's default
+    @param jpg_quality: JPEG quality 0-100
+    @param save_every_nth_frame: Only save every n'th frame. The frames in-between are never decoded
+    @param start_sec: Time in seconds of the first frame that is saved. None -> start of the video
+    @param end_sec: Time in seconds where no more frames are saved. None -> end of the video
+    @param workers: Number of threads used for encoding and saving the frames
     @return: None
     """
 
     # Checks
-    _type_check.assert_types(to_check=[video_path, image_folder_path], expected_types=[str, str])
+    _type_check.assert_types(
+        to_check=[video_path, image_folder_path, image_format, png_compression, jpg_quality, save_every_nth_frame, workers],
+        expected_types=[str, str, str, int, int, int, int],
+        allow_nones=[0, 0, 0, 1, 0, 0, 0]
+    )
+    _type_check.assert_type(start_sec, (int, float), allow_none=True)
+    _type_check.assert_type(end_sec, (int, float), allow_none=True)
     _io.path_exists(video_path)
     _io.path_exists(image_folder_path)
     _type_check.assert_in(_io.get_file_extension(video_path).lower(), [".mp4", ".avi"])
+    _type_check.assert_in(image_format, [".png", ".jpg", ".npy"])
+    if (png_compression is not None) and not (0 <= png_compression <= 9):
+        raise ValueError(f"Expected 0 <= `png_compression` <= 9, but received `{png_compression}`")
+    if not (0 <= jpg_quality <= 100):
+        raise ValueError(f"Expected 0 <= `jpg_quality` <= 100, but received `{jpg_quality}`")
+    _type_check.assert_comparison_number(save_every_nth_frame, 1, ">=", "save_every_nth_frame")
+    if (start_sec is not None) and (start_sec < 0):
+        raise ValueError(f"Expected `start_sec` >= 0, but received `{start_sec}`")
+    if (end_sec is not None) and (end_sec <= 0):
+        raise ValueError(f"Expected `end_sec` > 0, but received `{end_sec}`")
+    if (start_sec is not None) and (end_sec is not None) and (end_sec <= start_sec):
+        raise ValueError(f"Expected `end_sec` > `start_sec`, but received `{end_sec}` and `{start_sec}`")
 
-    # Extract and save individual frames
+    # Setup
     cap = _cv2.VideoCapture(video_path)
-    frame_i = -1
-    while cap.isOpened():
-        frame_i += 1
-        video_feed_active, frame = cap.read()
+    fps = cap.get(_cv2.CAP_PROP_FPS)
 
-        if not video_feed_active:
+    # Both ends of the interval must lie within the video. Skipped if the container doesn't report its length
+    frame_count = cap.get(_cv2.CAP_PROP_FRAME_COUNT)
+    if (fps > 0) and (frame_count > 0):
+        duration = frame_count / fps
+        if (start_sec is not None) and (start_sec >= duration):
             cap.release()
-            _cv2.destroyAllWindows()
-            break
-
-        # Save frame
-        save_path = _os.path.join(image_folder_path, str(frame_i)) + ".png"
-        successful_save = _cv2.imwrite(save_path, frame)
+            raise ValueError(f"Expected `start_sec` < {duration} (the length of the video), but received `{start_sec}`")
+        if (end_sec is not None) and (end_sec > duration):
+            cap.release()
+            raise ValueError(f"Expected `end_sec` <= {duration} (the length of the video), but received `{end_sec}`")
+    start = 0 if start_sec is None else int(round(start_sec * fps))
+    end = None if end_sec is None else int(round(end_sec * fps))
+
+    encode_params = []
+    if (image_format == ".png") and (png_compression is not None):
+        encode_params = [_cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+    elif image_format == ".jpg":
+        encode_params = [_cv2.IMWRITE_JPEG_QUALITY, jpg_quality]
+
+    def save_frame(indexed_frame):
+        frame_i, frame = indexed_frame
+        save_path = _os.path.join(image_folder_path, str(frame_i)) + image_format
+        if image_format == ".npy":
+            _np.save(save_path, frame)
+            return frame_i, True
+        return frame_i, _cv2.imwrite(save_path, frame, encode_params)
+
+    def check_saved(saved):
+        frame_i, successful_save = saved
         if not successful_save:
             raise RuntimeError(f"Failed to save frame {frame_i}, cause unknown")
 
+    # Extract and save individual frames
+    try:
+        run_frame_pipeline(_read_frames(cap, start, end, save_every_nth_frame), save_frame, check_saved, workers)
+    finally:
+        cap.release()
+
 
-def images_to_video(image_paths:list, video_save_path:str, fps:int=30, allow_override:bool=False) -> None:
+def _fit_image(image, width:int, height:int, mismatch:str):
+    """
+    Fit `image` to `width` x `height` according to `mismatch` (see `images_to_video()`).
+    NOTE: This function is only intended to be used by `images_to_video()`
+    """
+    h, w = image.shape[:2]
+    if (h, w) == (height, width):
+        return image
+
+    if mismatch == "error":
+        raise ValueError(f"Expect all images in `image_paths` to have the same dimensions, "
+                         f"but {(height, width, 3)} != {image.shape}")
+    elif mismatch == "resize":
+        return _cv2.resize(image, (width, height), interpolation=_cv2.INTER_AREA)
+
+    # Letterbox: Keep the aspect ratio and pad the rest with black
+    scale = min(width / w, height / h)
+    new_w, new_h = max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+    canvas = _np.zeros((height, width, 3), dtype=_np.uint8)
+    x, y = (width - new_w) // 2, (height - new_h) // 2
+    canvas[y:y + new_h, x:x + new_w] = _cv2.resize(image, (new_w, new_h), interpolation=_cv2.INTER_AREA)
+    return canvas
+
+
+def images_to_video(image_paths:list, video_save_path:str, fps:int=30, allow_override:bool=False,
+                    mismatch:str="error", workers:int=_DEFAULT_WORKERS, prefetch:int=32) -> None:
     """
     Make a video in .mp4 format from images at `image_paths` with `fps`.
+    The images are read (and resized if necessary) by a pool of `workers` threads,
+    which stays up to `prefetch` images ahead of the video writer.
 
-    @param image_paths: A list with 2 or more images. NOTE: all images must have the shape height, width and colors-channels
+    EXAMPLE:
+    >> images_to_video(sorted(glob("./timelapse/*.jpg")), "./timelapse.mp4", fps=24, mismatch="letterbox", workers=8)
+
+    @param image_paths: A list with 2 or more images. The size of the video is determined by the first image
     @param video_save_path: The path of the final video. NOTE: this must be suffixed by ".mp4"
     @param fps: Frames per second
     @param allow_override: If true, will override any already existing video located at `video_save_path`
+    @param mismatch: What to do with images which don't have the same size as the first one. Must be in:
+                     "error" -> raise a ValueError
+                     "resize" -> resize to the size of the first image (ignoring the aspect ratio)
+                     "letterbox" -> resize while keeping the aspect ratio and pad with black bars
+    @param workers: Number of threads used for reading images
+    @param prefetch: Maximum number of images which are read ahead of the video writer
     @return: None
     """
 
     # Checks
-    _type_check.assert_types([image_paths, video_save_path, fps, allow_override], [list, str, int, bool])
+    _type_check.assert_types(
+        to_check=[image_paths, video_save_path, fps, allow_override, mismatch, workers, prefetch],
+        expected_types=[list, str, int, bool, str, int, int]
+    )
+    _type_check.assert_in(mismatch, ["error", "resize", "letterbox"])
+    _type_check.assert_comparison_number(workers, 1, ">=", "workers")
+    _type_check.assert_comparison_number(prefetch, 1, ">=", "prefetch")
     if not allow_override:
         _io.assert_path_dont_exists(video_save_path)
     if not all([_os.path.exists(p) for p in image_paths]):
@@ -186,32 +711,31 @@ def images_to_video(image_paths:list, video_save_path:str, fps:int=30, allow_ove
     if fps < 1:
         raise ValueError(f"`fps` cannot be less then 1, received {fps}")
 
-    # Setup video writer and pass it the first frame
-    image = _cv2.imread(image_paths[0])
-    h, w, c = image.shape
-    fourcc = _cv2.VideoWriter_fourcc(*'mp4v')
-    video = _cv2.VideoWriter(video_save_path, fourcc, fps, (w, h))
-    video.write(image)
-
-    # Pass the rest of the images to `video`
-    for path in image_paths[1:]:
+    def read_image(path):
         image = _cv2.imread(path)
+        if image is None:
+            raise ValueError(f"Failed to read image `{path}`")
+        return image
 
-        # Check image dimensions and close everything if there's an error
-        if (h, w, c) != image.shape:
-            _cv2.destroyAllWindows()
-            video.release()
-            raise ValueError(f"Expect all images in `image_paths` to have the same dimensions, but {(h, w, c)} != {image.shape}")
-
-        video.write(image)
+    # The first image determines the size of the video
+    first_image = read_image(image_paths[0])
+    h, w = first_image.shape[:2]
+    fourcc = _cv2.VideoWriter_fourcc(*'mp4v')
+    video = _cv2.VideoWriter(video_save_path, fourcc, fps, (w, h))
 
-    _cv2.destroyAllWindows()
-    video.release()
+    # Pass the rest of the images to `video`. The video writer is released regardless of errors
+    try:
+        video.write(first_image)
+        process = lambda path: _fit_image(read_image(path), w, h, mismatch)
+        run_frame_pipeline(image_paths[1:], process, video.write, workers, prefetch)
+    finally:
+        video.release()
 
 
 def get_frame_from_video(video_path:str, random_frame:bool=False):
     """
     Select a single frame from `video_path`.
+    NOTE: The frame is found by seeking, so only the frames from the nearest keyframe and forward are decoded
 
     @param video_path: path pointing to a video file
     @param random_frame: if True, return af random frame, otherwise return the first frame
@@ -224,19 +748,12 @@ def get_frame_from_video(video_path:str, random_frame:bool=False):
     # Setup
     cap = _cv2.VideoCapture(video_path)
     save_index = 0 if not random_frame else _random.randint(0, int(cap.get(_cv2.CAP_PROP_FRAME_COUNT))-1)
-    frame_i = -1
-    return_frame = None
-
-    # Loop over video to find the frame specified by `save_index`
-    while cap.isOpened():
-        frame_i += 1
-        video_feed_active, frame = cap.read()
 
-        if (save_index == frame_i) or (not video_feed_active):
-            return_frame = frame
-            cap.release()
-            _cv2.destroyAllWindows()
-            break
+    # Seek to the frame specified by `save_index`
+    return_frame = None
+    if _seek_to_frame(cap, save_index):
+        _, return_frame = cap.read()
+    cap.release()
 
     # Wrap up
     if return_frame is None:
@@ -244,10 +761,188 @@ def get_frame_from_video(video_path:str, random_frame:bool=False):
     return return_frame
 
 
+def get_frames_from_video(video_path:str, indices:list) -> list:
+    """
+    Select the frames at `indices` from `video_path`. The indices are sorted and fetched in a single forward pass,
+    where small gaps are skipped by grabbing (without decoding) and larger gaps by seeking.
+    This is a lot faster than calling `get_frame_from_video()` once for every frame.
+
+    EXAMPLE:
+    >> frames = get_frames_from_video("./video.mp4", [500, 10, 10, 2000])
+    >> len(frames)
+    4
+
+    @param video_path: path pointing to a video file
+    @param indices: frame indices. Duplicates are allowed and the order doesn't matter.
+    @return: list of images in np.ndarray format, in the same order as `indices`
+    """
+    # Checks
+    _type_check.assert_types([video_path, indices], [str, list])
+    _type_check.assert_list_slow(indices, int)
+    _io.assert_path(video_path)
+    if indices and min(indices) < 0:
+        raise ValueError(f"Expected all `indices` to be >= 0, but received `{min(indices)}`")
+
+    # Setup
+    cap = _cv2.VideoCapture(video_path)
+    frames = {}
+    position = 0 # The index of the frame `cap.read()` would return next
+
+    # Fetch the frames in a single forward pass
+    try:
+        for index in sorted(set(indices)):
+            if index - position > _SEEK_MIN_GAP:
+                is_ok = _seek_to_frame(cap, index)
+            else:
+                is_ok = all(cap.grab() for _ in range(index - position))
+
+            video_feed_active, frame = cap.read() if is_ok else (False, None)
+            if not video_feed_active:
+                raise RuntimeError(f"Failed to extract frame `{index}`. The video has "
+                                   f"`{int(cap.get(_cv2.CAP_PROP_FRAME_COUNT))}` frames")
+            frames[index] = frame
+            position = index + 1
+    finally:
+        cap.release()
+
+    return [frames[index] for index in indices]
+
+
+class FrameStore:
+    """
+    Decode a video once into a memory-mapped uint8 file and serve frames and frame ranges as zero-copy views.
+    Multiple processes (e.g. DataLoader workers) can read the same store without re-decoding the video or
+    duplicating it in RAM, because the operating system shares the memory-mapped pages between them.
+
+    NOTES:
+    * File format: a small fixed size json header (shape, fps, every_nth_frame, source) followed by the raw frames
+    * The frames are read-only. Use `.copy()` if a frame needs to be modified
+    * Pickling a FrameStore only pickles its path, which makes it cheap to pass to other processes
+
+    EXAMPLE:
+    >> store = FrameStore.create("./clip.mp4", "./clip.frames", every_nth_frame=2)
+    >> store = FrameStore("./clip.frames") # e.g. inside a worker process
+    >> len(store), store.fps
+    (450, 15.0)
+    >> store[10].shape
+    (1080, 1920, 3)
+    >> store.get_frames(10, 20).shape
+    (10, 1080, 1920, 3)
+    """
+
+    _MAGIC = b"DUTILSFS"
+    _HEADER_SIZE = 512 # Including `_MAGIC`. The header is padded with spaces to this size
+
+
+    def __init__(self, store_path:str):
+        """ @param store_path: Path to a frame store made with `FrameStore.create()` """
+        _type_check.assert_type(store_path, str)
+        _io.assert_path(store_path)
+
+        with open(store_path, "rb") as f:
+            header = f.read(self._HEADER_SIZE)
+        if header[:len(self._MAGIC)] != self._MAGIC:
+            raise ValueError(f"`{store_path}` is not recognized as a frame store")
+
+        meta = _json.loads(header[len(self._MAGIC):].decode("UTF-8"))
+        self.store_path = store_path
+        self.shape = tuple(meta["shape"])
+        self.fps = meta["fps"]
+        self.every_nth_frame = meta["every_nth_frame"]
+        self.source = meta["source"]
+        self.frames = _np.memmap(store_path, dtype=_np.uint8, mode="r", offset=self._HEADER_SIZE, shape=self.shape)
+
+
+    @classmethod
+    def create(cls, video_path:str, store_path:str, every_nth_frame:int=1, allow_override:bool=False):
+        """
+        Decode `video_path` into a new frame store at `store_path`.
+        The frames are streamed to disk, so memory use is independent of video length.
+
+        @param video_path: path pointing to a video file
+        @param store_path: Where the frame store is saved. NOTE: It's roughly height*width*3 bytes per frame
+        @param every_nth_frame: Only store every n'th frame. The frames in-between are never decoded
+        @param allow_override: If true, will override any already existing file located at `store_path`
+        @return: The new FrameStore
+        """
+        # Checks
+        _type_check.assert_types([video_path, store_path, every_nth_frame, allow_override], [str, str, int, bool])
+        _io.assert_path(video_path)
+        _type_check.assert_comparison_number(every_nth_frame, 1, ">=", "every_nth_frame")
+        if not allow_override:
+            _io.assert_path_dont_exists(store_path)
+
+        # Stream frames to a temporary file, so an interrupted decode never leaves a half-written store behind
+        cap = _cv2.VideoCapture(video_path)
+        fps = cap.get(_cv2.CAP_PROP_FPS) / every_nth_frame
+        temp_path = store_path + ".tmp"
+        frame_count, frame_shape = 0, None
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(b" " * cls._HEADER_SIZE) # Written at the end, when the number of frames is known
+                for _, frame in _read_frames(cap, every_nth_frame=every_nth_frame):
+                    if frame_shape is None:
+                        frame_shape = frame.shape
+                    f.write(_np.ascontiguousarray(frame, dtype=_np.uint8).tobytes())
+                    frame_count += 1
+
+                if frame_shape is None:
+                    raise RuntimeError(f"Failed to read any frames from `{video_path}`")
+
+                meta = {"shape": [frame_count, *frame_shape], "fps": fps, "every_nth_frame": every_nth_frame,
+                        "source": _os.path.abspath(video_path)}
+                header = cls._MAGIC + _json.dumps(meta).encode("UTF-8")
+                if len(header) > cls._HEADER_SIZE:
+                    raise RuntimeError("The frame store header is too large, `video_path` is probably very long")
+                f.seek(0)
+                f.write(header.ljust(cls._HEADER_SIZE, b" "))
+            _os.replace(temp_path, store_path)
+        finally:
+            cap.release()
+            if _os.path.exists(temp_path):
+                _os.remove(temp_path)
+
+        return cls(store_path)
+
+
+    def __len__(self):
+        return self.shape[0]
+
+
+    def __getitem__(self, index):
+        """ Return frame(s) at `index` (int or slice) as a read-only view. No data is copied """
+        return self.frames[index]
+
+
+    def get_frames(self, start:int, end:int):
+        """ Return the frames in range [`start`, `end`) as a single read-only view with shape (N, H, W, C) """
+        _type_check.assert_types([start, end], [int, int])
+        if not (0 <= start <= end <= len(self)):
+            raise ValueError(f"Expected 0 <= `start` <= `end` <= {len(self)}, but received `{start}` and `{end}`")
+        return self.frames[start:end]
+
+
+    def __getstate__(self):
+        return {"store_path": self.store_path} # Avoid pickling the frames themselves
+
+
+    def __setstate__(self, state):
+        self.__init__(state["store_path"])
+
+
+    def __str__(self):
+        return "FrameStore"
+
+
 __all__ = [
     "get_video_info",
+    "get_videos_info",
     "preprocess_video",
+    "preprocess_videos",
     "video_to_images",
     "images_to_video",
-    "get_frame_from_video"
+    "get_frame_from_video",
+    "get_frames_from_video",
+    "run_frame_pipeline",
+    "FrameStore",
 ]